@@ -6,13 +6,61 @@ ensuring consistent behavior, communication, and state management.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+from collections import deque
+from dataclasses import dataclass, field
 import asyncio
 import json
+import time
 import uuid
 from enum import Enum
 
+# orjson serializes datetimes natively in C; fall back to the stdlib encoder when it is missing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Agents stamp payloads with naive datetime.utcnow() values, so naive datetimes are UTC.
+# Non-string keys are stringified, as the stdlib encoder does.
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return obj.isoformat()
+    return str(obj)
+
+def dumps_json(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize a payload to JSON bytes at an external boundary
+    
+    sort_keys gives a canonical encoding, e.g. for hashing into cache keys;
+    indent pretty-prints with two spaces, e.g. for embedding in prompts.
+    """
+    if ORJSON_AVAILABLE:
+        option = _ORJSON_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(obj, default=_json_default, sort_keys=sort_keys, indent=2 if indent else None).encode()
+
+def loads_json(data: str | bytes) -> Any:
+    """Parse JSON text; errors are json.JSONDecodeError either way"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Number of recent responses each agent keeps for tracking
+MAX_RESPONSE_HISTORY = 1000
+
+# Maximum number of undelivered messages held in each agent's inbox
+INBOX_CAPACITY = 1024
+
 class AgentState(Enum):
     """Agent execution states"""
     IDLE = "idle"
@@ -24,6 +72,8 @@ class AgentState(Enum):
 class AgentMessage:
     """Standard message format for agent communication"""
     
+    __slots__ = ("_id", "_iso", "_timestamp", "sender", "recipient", "message_type", "content", "status")
+    
     def __init__(self, 
                  sender: str, 
                  recipient: str, 
@@ -31,51 +81,72 @@ class AgentMessage:
                  content: Any, 
                  message_id: Optional[str] = None,
                  timestamp: Optional[datetime] = None):
-        self.id = message_id or str(uuid.uuid4())
+        self._id = message_id
+        self._iso: Optional[str] = None
         self.sender = sender
         self.recipient = recipient
         self.message_type = message_type
         self.content = content
-        self.timestamp = timestamp or datetime.utcnow()
+        self._timestamp = timestamp or datetime.utcnow()
         self.status = "pending"
     
+    @property
+    def id(self) -> str:
+        # Generated on first access; most in-process messages never need one
+        if self._id is None:
+            self._id = uuid.uuid4().hex
+        return self._id
+    
+    @property
+    def timestamp(self) -> datetime:
+        return self._timestamp
+    
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._timestamp = value
+        self._iso = None
+    
     def to_dict(self) -> Dict[str, Any]:
+        """Serialize for external boundaries only; in-process routing passes the object itself"""
+        if self._iso is None:
+            self._iso = self._timestamp.isoformat()
         return {
             "id": self.id,
             "sender": self.sender,
             "recipient": self.recipient,
             "message_type": self.message_type,
             "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self._iso,
             "status": self.status
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AgentMessage':
+        """Rebuild a message received across an external boundary"""
         msg = cls(
             sender=data["sender"],
             recipient=data["recipient"],
             message_type=data["message_type"],
             content=data["content"],
-            message_id=data["id"]
+            message_id=data["id"],
+            timestamp=datetime.fromisoformat(data["timestamp"])
         )
-        msg.timestamp = datetime.fromisoformat(data["timestamp"])
         msg.status = data["status"]
         return msg
 
+@dataclass(slots=True)
 class AgentResponse:
     """Standard response format for agent operations"""
     
-    def __init__(self, 
-                 success: bool, 
-                 data: Any = None, 
-                 error: Optional[str] = None,
-                 metadata: Optional[Dict[str, Any]] = None):
-        self.success = success
-        self.data = data
-        self.error = error
-        self.metadata = metadata or {}
-        self.timestamp = datetime.utcnow()
+    success: bool
+    data: Any = None
+    error: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow, init=False)
+    
+    def __post_init__(self):
+        if self.metadata is None:
+            self.metadata = {}
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -89,6 +160,11 @@ class AgentResponse:
 class BaseAgent(ABC):
     """Base class for all agents in the Travya system"""
     
+    __slots__ = (
+        "name", "description", "capabilities", "dependencies", "state",
+        "registry", "response_history", "context", "metrics"
+    )
+    
     def __init__(self, 
                  name: str, 
                  description: str,
@@ -99,8 +175,8 @@ class BaseAgent(ABC):
         self.capabilities = capabilities
         self.dependencies = dependencies or []
         self.state = AgentState.IDLE
-        self.message_queue: List[AgentMessage] = []
-        self.response_history: List[AgentResponse] = []
+        self.registry: Optional[AgentRegistry] = None
+        self.response_history: deque[AgentResponse] = deque(maxlen=MAX_RESPONSE_HISTORY)
         self.context: Dict[str, Any] = {}
         self.metrics = {
             "requests_processed": 0,
@@ -119,41 +195,66 @@ class BaseAgent(ABC):
         """Validate if this agent can handle the request"""
         pass
     
+    def _get_registry(self) -> "AgentRegistry":
+        return self.registry or agent_registry
+    
     async def send_message(self, recipient: str, message_type: str, content: Any) -> str:
-        """Send a message to another agent"""
+        """Send a message to another agent's inbox"""
         message = AgentMessage(
             sender=self.name,
             recipient=recipient,
             message_type=message_type,
             content=content
         )
-        self.message_queue.append(message)
+        self._get_registry().post_message(message)
         return message.id
     
     async def receive_message(self) -> Optional[AgentMessage]:
-        """Receive the next message from the queue"""
-        if self.message_queue:
-            return self.message_queue.pop(0)
-        return None
+        """Receive the next message from this agent's inbox without waiting"""
+        inbox = self._get_registry().get_inbox(self.name)
+        if inbox is None or inbox.empty():
+            return None
+        return inbox.get_nowait()
+    
+    async def run(self):
+        """Serve messages from this agent's inbox until cancelled"""
+        inbox = self._get_registry().get_inbox(self.name)
+        if inbox is None:
+            raise ValueError(f"Agent {self.name} is not registered")
+        while True:
+            message = await inbox.get()
+            try:
+                response = await self.handle_message(message)
+                self.response_history.append(response)
+            finally:
+                inbox.task_done()
     
     async def handle_message(self, message: AgentMessage) -> AgentResponse:
         """Handle an incoming message"""
+        return await self.process_direct(message.content)
+    
+    async def process_direct(self, request: Dict[str, Any]) -> AgentResponse:
+        """Validate and process a request from an in-process caller
+        
+        Same state and metrics handling as handle_message, without building
+        an AgentMessage around the request.
+        """
         try:
             self.state = AgentState.PROCESSING
-            start_time = datetime.utcnow()
+            start_time = time.perf_counter()
             
             # Validate the request
-            if not await self.validate_request(message.content):
+            if not await self.validate_request(request):
                 return AgentResponse(
                     success=False,
                     error=f"Agent {self.name} cannot handle this request type"
                 )
             
             # Process the request
-            response = await self.process_request(message.content)
+            response = await self.process_request(request)
             
             # Update metrics
-            processing_time = (datetime.utcnow() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             self._update_metrics(response.success, processing_time)
             
             self.state = AgentState.COMPLETED
@@ -169,84 +270,128 @@ class BaseAgent(ABC):
     def _update_metrics(self, success: bool, processing_time: float):
         """Update agent metrics"""
         self.metrics["requests_processed"] += 1
-        self.metrics["last_activity"] = datetime.utcnow().isoformat()
+        # Epoch seconds; formatted only when status is requested
+        self.metrics["last_activity"] = time.time()
         
-        # Update success rate
+        # Incremental mean updates: mean += (x - mean) / n
         total_requests = self.metrics["requests_processed"]
         current_success_rate = self.metrics["success_rate"]
-        new_success_rate = ((current_success_rate * (total_requests - 1)) + (1 if success else 0)) / total_requests
-        self.metrics["success_rate"] = new_success_rate
+        self.metrics["success_rate"] = current_success_rate + ((1.0 if success else 0.0) - current_success_rate) / total_requests
         
-        # Update average response time
         current_avg_time = self.metrics["average_response_time"]
-        new_avg_time = ((current_avg_time * (total_requests - 1)) + processing_time) / total_requests
-        self.metrics["average_response_time"] = new_avg_time
+        self.metrics["average_response_time"] = current_avg_time + (processing_time - current_avg_time) / total_requests
     
     def get_status(self) -> Dict[str, Any]:
         """Get current agent status"""
+        last_activity = self.metrics["last_activity"]
         return {
             "name": self.name,
             "state": self.state.value,
             "capabilities": self.capabilities,
-            "metrics": self.metrics,
+            "metrics": {
+                **self.metrics,
+                "last_activity": datetime.fromtimestamp(last_activity, timezone.utc).isoformat() if last_activity is not None else None
+            },
             "context": self.context,
-            "queue_size": len(self.message_queue)
+            "queue_size": self._get_registry().inbox_size(self.name)
         }
     
     def reset(self):
         """Reset agent to initial state"""
         self.state = AgentState.IDLE
-        self.message_queue.clear()
         self.response_history.clear()
         self.context.clear()
-        self.metrics = {
-            "requests_processed": 0,
-            "success_rate": 0.0,
-            "average_response_time": 0.0,
-            "last_activity": None
-        }
+        # Reset in place so the dict keeps its layout and any held references stay valid
+        metrics = self.metrics
+        metrics["requests_processed"] = 0
+        metrics["success_rate"] = 0.0
+        metrics["average_response_time"] = 0.0
+        metrics["last_activity"] = None
 
 class AgentRegistry:
     """Registry for managing all agents in the system"""
     
     def __init__(self):
         self.agents: Dict[str, BaseAgent] = {}
-        self.message_bus: List[AgentMessage] = []
+        self._inboxes: Dict[str, asyncio.Queue] = {}
     
     def register_agent(self, agent: BaseAgent):
         """Register an agent in the system"""
         self.agents[agent.name] = agent
+        agent.registry = self
+        if agent.name not in self._inboxes:
+            self._inboxes[agent.name] = asyncio.Queue(maxsize=INBOX_CAPACITY)
+    
+    def get_inbox(self, name: str) -> Optional[asyncio.Queue]:
+        """Get the inbox of a registered agent"""
+        return self._inboxes.get(name)
+    
+    def inbox_size(self, name: str) -> int:
+        """Number of messages waiting in an agent's inbox"""
+        inbox = self._inboxes.get(name)
+        return inbox.qsize() if inbox is not None else 0
+    
+    def post_message(self, message: AgentMessage) -> bool:
+        """Queue a message for its recipient; returns False if it is unknown or its inbox is full"""
+        inbox = self._inboxes.get(message.recipient)
+        if inbox is None:
+            return False
+        try:
+            inbox.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
     
     def get_agent(self, name: str) -> Optional[BaseAgent]:
         """Get an agent by name"""
         return self.agents.get(name)
     
-    async def route_message(self, message: AgentMessage) -> bool:
+    async def route_message(self, message: AgentMessage) -> AgentResponse:
         """Route a message to the appropriate agent"""
         agent = self.get_agent(message.recipient)
         if agent:
             response = await agent.handle_message(message)
             # Store response for tracking
             agent.response_history.append(response)
-            return response.success
-        return False
+            return response
+        return AgentResponse(
+            success=False,
+            error=f"Agent {message.recipient} is not registered"
+        )
+    
+    async def send_direct(self, sender: str, recipient: str, message_type: str, content: Any) -> AgentResponse:
+        """Deliver a message to an in-process agent without serialization or history tracking"""
+        agent = self.agents.get(recipient)
+        if agent is None:
+            return AgentResponse(
+                success=False,
+                error=f"Agent {recipient} is not registered"
+            )
+        return await agent.process_direct(content)
     
     async def broadcast_message(self, sender: str, message_type: str, content: Any) -> List[AgentResponse]:
-        """Broadcast a message to all agents"""
-        responses = []
-        for agent_name in self.agents:
-            if agent_name != sender:
-                message = AgentMessage(sender, agent_name, message_type, content)
-                response = await self.route_message(message)
-                responses.append(response)
-        return responses
+        """Broadcast a message to all agents concurrently"""
+        messages = [
+            AgentMessage(sender, agent_name, message_type, content)
+            for agent_name in self.agents
+            if agent_name != sender
+        ]
+        results = await asyncio.gather(
+            *(self.route_message(message) for message in messages),
+            return_exceptions=True
+        )
+        return [
+            result if isinstance(result, AgentResponse)
+            else AgentResponse(success=False, error=f"Error routing message: {str(result)}")
+            for result in results
+        ]
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get status of all agents in the system"""
         return {
             "total_agents": len(self.agents),
             "agents": {name: agent.get_status() for name, agent in self.agents.items()},
-            "message_bus_size": len(self.message_bus)
+            "message_bus_size": sum(inbox.qsize() for inbox in self._inboxes.values())
         }
 
 # Global agent registry
@@ -11,18 +11,33 @@ This module implements comprehensive agent evaluation including:
 
 import json
 import asyncio
+import itertools
+import re
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import Callable, Deque, Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, fields
+from operator import attrgetter
 from enum import Enum
 import logging
 
+import numpy as np
+
 from app.core.config import settings
 from app.core.llm import call_llm
 from app.agents.sessions import memory_manager
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on retained evaluations and feedback entries per evaluator
+MAX_EVALUATION_HISTORY = 10000
+# Upper bound on evaluations awaiting human feedback; the oldest are dropped
+MAX_PENDING_EVALUATIONS = 1000
+
+# Numeric score tokens in LLM judge replies
+_SCORE_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+
 class EvaluationType(Enum):
     HUMAN_IN_LOOP = "human_in_loop"
     LLM_AS_JUDGE = "llm_as_judge"
@@ -35,7 +50,7 @@ class EvaluationStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
-@dataclass
+@dataclass(slots=True)
 class EvaluationCriteria:
     """Criteria for evaluating agent performance"""
     accuracy: float = 0.0
@@ -47,7 +62,13 @@ class EvaluationCriteria:
     response_time: float = 0.0
     cost_effectiveness: float = 0.0
 
-@dataclass
+# Scoring fields of EvaluationCriteria and the subset judged by default
+CRITERIA_FIELDS = frozenset(f.name for f in fields(EvaluationCriteria))
+DEFAULT_JUDGE_CRITERIA = ("accuracy", "relevance", "helpfulness", "creativity")
+# Criteria that mix LLM and human scores when completing a human-in-the-loop evaluation
+HUMAN_BLENDED_CRITERIA = ("accuracy", "relevance", "helpfulness")
+
+@dataclass(slots=True)
 class EvaluationResult:
     """Result of an agent evaluation"""
     evaluation_id: str
@@ -59,7 +80,7 @@ class EvaluationResult:
     timestamp: datetime
     metadata: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class HumanFeedback:
     """Human feedback for agent evaluation"""
     user_id: str
@@ -70,13 +91,40 @@ class HumanFeedback:
     feedback_text: str
     timestamp: datetime
 
+def _field_encoder(cls) -> Callable[[Any], Dict[str, Any]]:
+    """Build a flat dict encoder for a dataclass from its field names, resolved once"""
+    names = tuple(f.name for f in fields(cls))
+    getter = attrgetter(*names)
+    return lambda obj: dict(zip(names, getter(obj), strict=True))
+
+_criteria_to_dict = _field_encoder(EvaluationCriteria)
+_feedback_to_dict = _field_encoder(HumanFeedback)
+_evaluation_fields = _field_encoder(EvaluationResult)
+
+def evaluation_to_dict(result: EvaluationResult) -> Dict[str, Any]:
+    """Serialize an EvaluationResult like dataclasses.asdict, without its recursive walk"""
+    data = _evaluation_fields(result)
+    data["criteria"] = _criteria_to_dict(result.criteria)
+    data["metadata"] = dict(result.metadata)
+    return data
+
 class AgentEvaluator:
     """Main class for evaluating agent performance"""
     
     def __init__(self):
-        self.evaluation_history: List[EvaluationResult] = []
-        self.human_feedback: List[HumanFeedback] = []
+        self.evaluation_history: Deque[EvaluationResult] = deque(maxlen=MAX_EVALUATION_HISTORY)
+        self.human_feedback: Deque[HumanFeedback] = deque(maxlen=MAX_EVALUATION_HISTORY)
+        self._eval_by_id: Dict[str, EvaluationResult] = {}
+        self._pending_by_id: "OrderedDict[str, EvaluationResult]" = OrderedDict()
+        self._id_counter = itertools.count()
+        self._epoch_ms = int(time.time() * 1000)
         self.llm_judge_prompts = self._load_judge_prompts()
+        self._prompt_fns = {
+            name: self._compile_judge_prompt(template)
+            for name, template in self.llm_judge_prompts.items()
+        }
+        # The default criteria set is fixed, so resolve its judges once
+        self._default_judges = self._select_judges(DEFAULT_JUDGE_CRITERIA)
     
     def _load_judge_prompts(self) -> Dict[str, str]:
         """Load LLM judge prompts for different evaluation types"""
@@ -127,6 +175,21 @@ class AgentEvaluator:
             Provide an overall rating (1-10) and brief explanation:"""
         }
     
+    @staticmethod
+    def _compile_judge_prompt(template: str) -> Callable[[str, str], str]:
+        """Split a judge prompt around its placeholders once so filling it is plain concatenation"""
+        head, rest = template.split("{query}", 1)
+        middle, tail = rest.split("{response}", 1)
+        return lambda query, response: f"{head}{query}{middle}{response}{tail}"
+    
+    def _select_judges(self, criteria: List[str]) -> Tuple[Tuple[str, Callable[[str, str], str]], ...]:
+        """Pair each requested criterion with its prompt function, skipping unknown ones"""
+        return tuple(
+            (criterion, self._prompt_fns[criterion])
+            for criterion in criteria
+            if criterion in self._prompt_fns and criterion in CRITERIA_FIELDS
+        )
+    
     async def evaluate_with_llm_judge(
         self, 
         agent_name: str, 
@@ -136,33 +199,40 @@ class AgentEvaluator:
     ) -> EvaluationResult:
         """Evaluate agent response using LLM as judge"""
         if criteria is None:
-            criteria = ["accuracy", "relevance", "helpfulness", "creativity"]
+            criteria = list(DEFAULT_JUDGE_CRITERIA)
+            judges = self._default_judges
+        else:
+            judges = self._select_judges(criteria)
         
-        evaluation_criteria = EvaluationCriteria()
+        scores: Dict[str, float] = {}
         feedback_parts = []
         
+        # Judge calls are independent, so issue them all at once off the event loop
+        prompts = [fill(query, response) for _, fill in judges]
+        prompts.append(self._prompt_fns["overall"](query, response))
+        judge_responses = await asyncio.gather(
+            *(asyncio.to_thread(call_llm, prompt) for prompt in prompts),
+            return_exceptions=True
+        )
+        
         # Evaluate each criterion
-        for criterion in criteria:
-            if criterion in self.llm_judge_prompts:
-                prompt = self.llm_judge_prompts[criterion].format(
-                    query=query, response=response
-                )
-                
-                try:
-                    judge_response = call_llm(prompt)
-                    score = self._extract_score(judge_response)
-                    setattr(evaluation_criteria, criterion, score)
-                    feedback_parts.append(f"{criterion}: {score}/10")
-                except Exception as e:
-                    logger.error(f"Error evaluating {criterion}: {e}")
-                    setattr(evaluation_criteria, criterion, 0.0)
+        for (criterion, _), judge_response in zip(judges, judge_responses[:-1], strict=True):
+            try:
+                if isinstance(judge_response, Exception):
+                    raise judge_response
+                score = self._extract_score(judge_response)
+                scores[criterion] = score
+                feedback_parts.append(f"{criterion}: {score}/10")
+            except Exception as e:
+                logger.error(f"Error evaluating {criterion}: {e}")
+                scores[criterion] = 0.0
+        evaluation_criteria = EvaluationCriteria(**scores)
         
         # Overall evaluation
         try:
-            overall_prompt = self.llm_judge_prompts["overall"].format(
-                query=query, response=response
-            )
-            overall_response = call_llm(overall_prompt)
+            overall_response = judge_responses[-1]
+            if isinstance(overall_response, Exception):
+                raise overall_response
             overall_score = self._extract_score(overall_response)
             overall_feedback = self._extract_feedback(overall_response)
         except Exception as e:
@@ -180,7 +250,7 @@ class AgentEvaluator:
                            evaluation_criteria.relevance, evaluation_criteria.helpfulness)
         
         evaluation_result = EvaluationResult(
-            evaluation_id=f"eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{agent_name}",
+            evaluation_id=f"{self._next_id('eval')}_{agent_name}",
             agent_name=agent_name,
             evaluation_type=EvaluationType.LLM_AS_JUDGE,
             criteria=evaluation_criteria,
@@ -194,9 +264,32 @@ class AgentEvaluator:
             }
         )
         
-        self.evaluation_history.append(evaluation_result)
+        self._record_evaluation(evaluation_result)
         return evaluation_result
     
+    def _next_id(self, prefix: str) -> str:
+        """Collision-free id: evaluator start time plus a per-evaluator counter"""
+        return f"{prefix}_{self._epoch_ms}_{next(self._id_counter):x}"
+    
+    def _record_evaluation(self, evaluation_result: EvaluationResult):
+        """Append to the bounded history and keep the id index in step with evictions"""
+        history = self.evaluation_history
+        if len(history) == history.maxlen:
+            evicted = history[0]
+            if self._eval_by_id.get(evicted.evaluation_id) is evicted:
+                del self._eval_by_id[evicted.evaluation_id]
+        history.append(evaluation_result)
+        self._eval_by_id[evaluation_result.evaluation_id] = evaluation_result
+    
+    def _replace_evaluation(self, old: EvaluationResult, new: EvaluationResult):
+        """Swap a recorded evaluation for its updated version"""
+        history = self.evaluation_history
+        for offset, eval_result in enumerate(reversed(history), 1):
+            if eval_result is old:
+                history[len(history) - offset] = new
+                break
+        self._eval_by_id[new.evaluation_id] = new
+    
     async def collect_human_feedback(
         self,
         user_id: str,
@@ -242,7 +335,7 @@ class AgentEvaluator:
         
         # Create a pending evaluation that requires human feedback
         pending_evaluation = EvaluationResult(
-            evaluation_id=f"pending_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{agent_name}",
+            evaluation_id=f"{self._next_id('pending')}_{agent_name}",
             agent_name=agent_name,
             evaluation_type=EvaluationType.HUMAN_IN_LOOP,
             criteria=EvaluationCriteria(),
@@ -253,10 +346,16 @@ class AgentEvaluator:
                 "query": query,
                 "response": response,
                 "status": "pending_human_feedback",
-                "llm_evaluation": asdict(llm_evaluation)
+                "llm_evaluation": evaluation_to_dict(llm_evaluation)
             }
         )
         
+        # Hold the pending evaluation (bounded) until complete_human_evaluation
+        pending = self._pending_by_id
+        if len(pending) >= MAX_PENDING_EVALUATIONS:
+            pending.popitem(last=False)
+        pending[pending_evaluation.evaluation_id] = pending_evaluation
+        
         return pending_evaluation, None
     
     async def complete_human_evaluation(
@@ -267,39 +366,36 @@ class AgentEvaluator:
         """Complete human-in-the-loop evaluation with feedback"""
         
         # Find the pending evaluation
-        pending_eval = None
-        for eval_result in self.evaluation_history:
-            if eval_result.evaluation_id == evaluation_id:
-                pending_eval = eval_result
-                break
+        pending_eval = self._pending_by_id.pop(evaluation_id, None) or self._eval_by_id.get(evaluation_id)
         
         if not pending_eval:
             raise ValueError(f"Evaluation {evaluation_id} not found")
         
         # Create completed evaluation combining LLM and human feedback
         llm_eval = pending_eval.metadata.get("llm_evaluation", {})
+        llm_criteria = llm_eval.get("criteria") or {}
         
         # Weight human feedback more heavily
         human_weight = 0.7
         llm_weight = 0.3
+        human_score = human_feedback.rating * 2  # Convert 1-5 to 1-10 scale
+        weighted_human = human_score * human_weight
+        
+        overall_score = weighted_human + llm_eval.get("overall_score", 5) * llm_weight
         
-        overall_score = (
-            human_feedback.rating * 2 * human_weight +  # Convert 1-5 to 1-10 scale
-            llm_eval.get("overall_score", 5) * llm_weight
+        # Blend the LLM criteria scores with the human score in one vector op
+        llm_scores = np.array(
+            [llm_criteria.get(name, 0) for name in HUMAN_BLENDED_CRITERIA], dtype=np.float64
         )
+        blended = (llm_scores * llm_weight + weighted_human).tolist()
         
         completed_evaluation = EvaluationResult(
             evaluation_id=evaluation_id,
             agent_name=pending_eval.agent_name,
             evaluation_type=EvaluationType.HUMAN_IN_LOOP,
             criteria=EvaluationCriteria(
-                accuracy=llm_eval.get("criteria", {}).get("accuracy", 0) * llm_weight + 
-                        human_feedback.rating * 2 * human_weight,
-                relevance=llm_eval.get("criteria", {}).get("relevance", 0) * llm_weight + 
-                         human_feedback.rating * 2 * human_weight,
-                helpfulness=llm_eval.get("criteria", {}).get("helpfulness", 0) * llm_weight + 
-                           human_feedback.rating * 2 * human_weight,
-                user_satisfaction=human_feedback.rating * 2,  # Pure human rating
+                **dict(zip(HUMAN_BLENDED_CRITERIA, blended, strict=True)),
+                user_satisfaction=human_score,  # Pure human rating
             ),
             overall_score=overall_score,
             feedback=f"Human Feedback: {human_feedback.feedback_text}. LLM: {llm_eval.get('feedback', '')}",
@@ -307,17 +403,18 @@ class AgentEvaluator:
             metadata={
                 "query": pending_eval.metadata["query"],
                 "response": pending_eval.metadata["response"],
-                "human_feedback": asdict(human_feedback),
+                "human_feedback": _feedback_to_dict(human_feedback),
                 "llm_evaluation": llm_eval,
                 "status": "completed"
             }
         )
         
-        # Update the evaluation in history
-        for i, eval_result in enumerate(self.evaluation_history):
-            if eval_result.evaluation_id == evaluation_id:
-                self.evaluation_history[i] = completed_evaluation
-                break
+        # Pending evaluations were never recorded; only a re-completed one
+        # is already in history and has to be replaced in place
+        if evaluation_id in self._eval_by_id:
+            self._replace_evaluation(self._eval_by_id[evaluation_id], completed_evaluation)
+        else:
+            self._record_evaluation(completed_evaluation)
         
         return completed_evaluation
     
@@ -333,7 +430,7 @@ class AgentEvaluator:
         # This would typically involve routing queries to different agents
         # and collecting performance metrics over time
         
-        test_id = f"ab_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        test_id = self._next_id("ab_test")
         start_time = datetime.now()
         end_time = start_time + timedelta(hours=test_duration_hours)
         
@@ -374,6 +471,9 @@ class AgentEvaluator:
         
         cutoff_date = datetime.now() - timedelta(days=days)
         
+        # evaluation_history is a public deque that callers append to
+        # directly, so parallel score/time/agent arrays could not be kept in
+        # step with it; one filtering pass over the history is the source of truth
         agent_evaluations = [
             eval_result for eval_result in self.evaluation_history
             if eval_result.agent_name == agent_name and eval_result.timestamp >= cutoff_date
@@ -388,15 +488,17 @@ class AgentEvaluator:
                 "performance_trend": "no_data"
             }
         
-        scores = [eval_result.overall_score for eval_result in agent_evaluations]
-        average_score = sum(scores) / len(scores)
+        scores = np.fromiter(
+            (eval_result.overall_score for eval_result in agent_evaluations),
+            dtype=np.float64,
+            count=len(agent_evaluations)
+        )
+        average_score = float(scores.mean())
         
         # Calculate trend
         if len(scores) >= 2:
-            recent_scores = scores[-len(scores)//2:]
-            older_scores = scores[:len(scores)//2]
-            recent_avg = sum(recent_scores) / len(recent_scores)
-            older_avg = sum(older_scores) / len(older_scores)
+            recent_avg = scores[-len(scores)//2:].mean()
+            older_avg = scores[:len(scores)//2].mean()
             
             if recent_avg > older_avg * 1.05:
                 trend = "improving"
@@ -425,12 +527,10 @@ class AgentEvaluator:
     
     def _extract_score(self, response: str) -> float:
         """Extract numerical score from LLM response"""
-        import re
-        
-        # Look for numbers in the response
-        numbers = re.findall(r'\b(\d+(?:\.\d+)?)\b', response)
-        if numbers:
-            score = float(numbers[0])
+        # Only the first number matters, so stop at the first match
+        match = _SCORE_RE.search(response)
+        if match:
+            score = float(match.group())
             # Ensure score is in 1-10 range
             return max(1.0, min(10.0, score))
         
@@ -439,8 +539,7 @@ class AgentEvaluator:
     def _extract_feedback(self, response: str) -> str:
         """Extract feedback text from LLM response"""
         # Remove score numbers and return the rest
-        import re
-        cleaned = re.sub(r'\b\d+(?:\.\d+)?\b', '', response)
+        cleaned = _SCORE_RE.sub('', response)
         cleaned = cleaned.strip()
         return cleaned if cleaned else "No detailed feedback provided"
 
@@ -4,12 +4,81 @@ This module provides a way to emit events from agents to SSE streams.
 """
 import logging
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
-# Global dictionary to store agent event queues for each session
-agent_event_queues: Dict[str, asyncio.Queue] = {}
+# Default number of pending batches buffered per session before the oldest are dropped
+DEFAULT_RING_CAPACITY = 1024
+
+# Events emitted for a session within this window (seconds) are delivered as one batch
+COALESCE_WINDOW = 0.005
+
+
+class SpscRing:
+    """
+    Bounded single-producer/single-consumer ring buffer for agent events.
+
+    Backed by a preallocated list with head/tail indices, so puts and gets are
+    O(1) without per-operation locking. When the consumer falls behind, the
+    oldest pending event is overwritten to keep memory bounded.
+    """
+    __slots__ = ("buf", "head", "tail", "cap", "evt", "dropped")
+
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY):
+        self.buf: List[Any] = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.cap = capacity
+        self.evt = asyncio.Event()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.tail - self.head
+
+    def put(self, item: Any) -> bool:
+        """Store an item, dropping the oldest one on overflow. Returns False if an item was dropped."""
+        dropped = self.tail - self.head >= self.cap
+        if dropped:
+            # The new item overwrites the oldest slot below, so a slow
+            # consumer never blocks the producer
+            self.head += 1
+            self.dropped += 1
+        self.buf[self.tail % self.cap] = item
+        self.tail += 1
+        self.evt.set()
+        return not dropped
+
+    async def get(self) -> Any:
+        """Wait for and return the next item."""
+        while self.head == self.tail:
+            self.evt.clear()
+            await self.evt.wait()
+        index = self.head % self.cap
+        item = self.buf[index]
+        self.buf[index] = None
+        self.head += 1
+        return item
+
+
+# Global dictionary to store agent event buffers for each session
+agent_event_queues: Dict[str, SpscRing] = {}
+
+# Events waiting for the coalescing window to close, and the scheduled flush per session
+_pending_events: Dict[str, List[dict]] = {}
+_flush_handles: Dict[str, asyncio.TimerHandle] = {}
+
+def _flush_events(session_id: str):
+    """Deliver the session's pending events to its buffer as a single batch."""
+    _flush_handles.pop(session_id, None)
+    events = _pending_events.pop(session_id, None)
+    ring = agent_event_queues.get(session_id)
+    if not events or ring is None:
+        return
+    if not ring.put(events):
+        logger.warning(
+            f"Event buffer full for session {session_id}, dropped oldest batch ({ring.dropped} dropped so far)"
+        )
 
 async def emit_agent_event(session_id: str, event_data: dict):
     """
@@ -25,9 +94,13 @@ async def emit_agent_event(session_id: str, event_data: dict):
             - data: Optional additional data
             - confidence: Optional confidence score (0-1)
     """
-    if session_id in agent_event_queues:
+    ring = agent_event_queues.get(session_id)
+    if ring is not None:
         try:
-            await agent_event_queues[session_id].put(event_data)
+            _pending_events.setdefault(session_id, []).append(event_data)
+            if session_id not in _flush_handles:
+                loop = asyncio.get_running_loop()
+                _flush_handles[session_id] = loop.call_later(COALESCE_WINDOW, _flush_events, session_id)
             logger.info(f"📤 Emitted {event_data.get('event_type')} event for {event_data.get('agent_type')} in session {session_id}")
         except Exception as e:
             logger.error(f"Failed to emit event: {e}")
@@ -35,14 +108,22 @@ async def emit_agent_event(session_id: str, event_data: dict):
         # Queue doesn't exist yet, this is expected for early events
         logger.debug(f"No queue for session {session_id}, event not emitted: {event_data.get('event_type')}")
 
-def register_session(session_id: str, queue: asyncio.Queue):
-    """Register a new session with its event queue."""
-    agent_event_queues[session_id] = queue
+def register_session(session_id: str, capacity: int = DEFAULT_RING_CAPACITY) -> SpscRing:
+    """Register a new session and return its event buffer.
+
+    Each item read from the buffer is a list of events emitted within one coalescing window.
+    """
+    ring = SpscRing(capacity)
+    agent_event_queues[session_id] = ring
     logger.info(f"📝 Registered session {session_id} for event streaming")
+    return ring
 
 def unregister_session(session_id: str):
     """Unregister a session and cleanup its event queue."""
+    handle = _flush_handles.pop(session_id, None)
+    if handle is not None:
+        handle.cancel()
+    _pending_events.pop(session_id, None)
     if session_id in agent_event_queues:
         del agent_event_queues[session_id]
         logger.info(f"🗑️ Unregistered session {session_id}")
-
@@ -10,15 +10,190 @@ This agent provides real booking capabilities using:
 """
 
 import asyncio
+import functools
+import itertools
 import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+import time
+from typing import Dict, Any, List, Literal, Optional, Tuple
+from datetime import date, datetime, timedelta
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from .base_agent import BaseAgent, AgentResponse
 from .real_apis import amadeus, stripe_api
+from .ttl_cache import TTLCache, cache_key
+
+# Credentials are fixed for the process lifetime, so decide real vs mock once
+_AMADEUS_ENABLED = bool(amadeus and amadeus.client_id)
+_STRIPE_ENABLED = bool(stripe_api and stripe_api.secret_key)
+
+if not _AMADEUS_ENABLED:
+    print("Amadeus credentials not configured, booker will use mock flights")
+if not _STRIPE_ENABLED:
+    print("Stripe credentials not configured, booker will use mock payments")
+
+# Ids issued by the mock fallbacks, e.g. "mock_flight_3"
+_MOCK_ID_PREFIX = "mock_"
+
+# Result cache lifetimes (seconds): flight prices move faster than hotel
+# listings, and availability is only trusted for a minute.
+FLIGHT_SEARCH_TTL = 600
+HOTEL_SEARCH_TTL = 1800
+AVAILABILITY_TTL = 60
+# Empty answers are cached briefly so retry storms don't hammer suppliers
+NEGATIVE_RESULT_TTL = 60
+
+_flight_search_cache = TTLCache(ttl=FLIGHT_SEARCH_TTL)
+_hotel_search_cache = TTLCache(ttl=HOTEL_SEARCH_TTL)
+_availability_cache = TTLCache(ttl=AVAILABILITY_TTL)
+
+def _cache_search_result(cache: TTLCache, key: Tuple, result: Dict[str, Any]):
+    """Cache results for the full TTL and empty answers briefly; never errors"""
+    total_results = result.get("total_results")
+    if total_results is None:
+        return
+    if total_results > 0:
+        cache.set(key, result)
+    else:
+        cache.set(key, result, ttl=NEGATIVE_RESULT_TTL)
+
+# Confirmation polling: most confirmations land within 500 ms, so poll
+# quickly at first, then back off to 1 s, giving up after the deadline.
+_POLL_DELAYS = (0.2, 0.2, 0.5, 0.5, 1.0)
+CONFIRMATION_DEADLINE = 5.0
+_FINAL_BOOKING_STATUSES = frozenset({"confirmed", "cancelled", "failed"})
+
+def _poll_delay(attempt: int) -> float:
+    """Delay before the next status poll, capped at the last schedule entry"""
+    return _POLL_DELAYS[attempt] if attempt < len(_POLL_DELAYS) else _POLL_DELAYS[-1]
+
+# Static fields of the mock fallbacks; each response merges its own values
+# into a fresh copy with |, so these templates are never shared or mutated
+_MOCK_FLIGHT_BASE = {
+    "id": "mock_flight_123",
+    "airline": "Mock Airlines",
+    "flight_number": "MA123",
+    "duration": "5h 30m",
+    "price": 299.99,
+    "currency": "USD",
+    "stops": 0
+}
+_MOCK_BOOKING_BASE = {
+    "total_price": 299.99,
+    "currency": "USD",
+    "booking_status": "confirmed",
+    "terms_and_conditions": "Mock booking - for testing purposes only"
+}
+_MOCK_PAYMENT_BASE = {
+    "status": "succeeded",
+    "payment_method": "mock_card"
+}
+
+# Sequence for booking, confirmation and search ids; seeded from the boot
+# time so ids keep their old magnitude but never collide within a process
+_id_counter = itertools.count(int(time.time()))
+
+# Hotel stay dates recur across searches and bookings; parse each string once
+_parse_iso_datetime = functools.lru_cache(maxsize=1024)(datetime.fromisoformat)
+
+def _stay_nights(check_in: str, check_out: str) -> int:
+    """Number of nights between two ISO dates, at least one"""
+    try:
+        nights = (_parse_iso_datetime(check_out) - _parse_iso_datetime(check_in)).days
+    except (TypeError, ValueError):
+        return 1
+    return max(1, nights)
+
+# Request types this agent accepts
+_VALID_TYPES = frozenset({
+    "book", "booking", "flight", "hotel", "payment",
+    "search", "availability", "confirm", "cancel", "trip"
+})
+
+# Dates may be left blank by callers that only search by destination
+OptionalDate = date | datetime | Literal[""] | None
+
+class BookingRequest(BaseModel):
+    """Structural contract for the booking_request payload"""
+    model_config = ConfigDict(extra="allow")
+    
+    passengers: int = Field(default=1, ge=1)
+    guests: int = Field(default=1, ge=1)
+    rooms: int = Field(default=1, ge=1)
+    amount: float = Field(default=0, ge=0)
+    currency: str = Field(default="usd", pattern=r"^[A-Za-z]{3}$")
+    departure_date: OptionalDate = None
+    return_date: OptionalDate = None
+    check_in: OptionalDate = None
+    check_out: OptionalDate = None
+
+# Built once at import so each validation is a single pydantic-core call
+_BOOKING_REQUEST_ADAPTER = TypeAdapter(BookingRequest)
+
+def _booking_request_error(booking_request: Any) -> Optional[str]:
+    """Describe why a booking_request payload is invalid, or None if it is valid"""
+    try:
+        _BOOKING_REQUEST_ADAPTER.validate_python(booking_request)
+    except ValidationError as e:
+        return str(e)
+    return None
 
 class ImprovedBookerAgent(BaseAgent):
     """Enhanced booker agent with real API integrations"""
     
+    # Long-lived singleton with no state beyond BaseAgent's slots
+    __slots__ = ()
+    
+    # query_type -> (handler method, response_data key, capabilities used)
+    _FLIGHT_HANDLER = (
+        "_process_flight_booking",
+        "flight_booking",
+        ("flight_booking", "payment_processing", "confirmation_handling")
+    )
+    _HANDLERS: Dict[str, Tuple[str, Optional[str], Tuple[str, ...]]] = {
+        "book": _FLIGHT_HANDLER,
+        "booking": _FLIGHT_HANDLER,
+        "flight": _FLIGHT_HANDLER,
+        "hotel": (
+            "_process_hotel_booking",
+            "hotel_booking",
+            ("hotel_booking", "payment_processing", "confirmation_handling")
+        ),
+        "payment": ("_process_payment", "payment", ("payment_processing",)),
+        "search": ("_search_bookings", "search_results", ("price_comparison", "availability_checking")),
+        "availability": ("_check_availability", "availability", ("availability_checking",)),
+        "confirm": ("_confirm_booking", "confirmation", ("confirmation_handling",)),
+        "cancel": ("_cancel_booking", "cancellation", ("cancellation_processing",)),
+        # Trip handlers return several sections, merged into response_data
+        "trip": (
+            "_process_trip_booking",
+            None,
+            ("flight_booking", "hotel_booking", "payment_processing", "confirmation_handling")
+        )
+    }
+    
+    # query_type -> capabilities, returned by reference from _get_used_capabilities
+    _CAPS_BY_TYPE: Dict[str, Tuple[str, ...]] = {
+        query_type: capabilities for query_type, (_, _, capabilities) in _HANDLERS.items()
+    }
+    
+    # Static suggestions offered when a search comes back empty
+    _ALTERNATIVES: Tuple[Dict[str, str], ...] = (
+        {
+            "type": "alternative_dates",
+            "suggestion": "Try different departure dates",
+            "description": "Flights may be available on nearby dates"
+        },
+        {
+            "type": "alternative_airports",
+            "suggestion": "Consider nearby airports",
+            "description": "Check flights from nearby airports for better availability"
+        },
+        {
+            "type": "alternative_destinations",
+            "suggestion": "Explore similar destinations",
+            "description": "Consider alternative destinations with similar attractions"
+        }
+    )
+    
     def __init__(self):
         super().__init__(
             name="booker",
@@ -37,144 +212,119 @@ class ImprovedBookerAgent(BaseAgent):
         )
     
     async def validate_request(self, request: Dict[str, Any]) -> bool:
-        """Validate if this agent can handle the request"""
-        request_type = request.get("type", "")
-        return request_type in [
-            "book", "booking", "flight", "hotel", "payment", 
-            "search", "availability", "confirm", "cancel"
-        ]
+        """Validate if this agent can handle the request
+        
+        Only the request type is checked here; the booking_request schema is
+        validated once, in process_request, which reports what was wrong.
+        """
+        return request.get("type", "") in _VALID_TYPES
     
     async def process_request(self, request: Dict[str, Any]) -> AgentResponse:
         """Process a booking request with real API integrations"""
-        try:
-            query_type = request.get("type", "book")
-            booking_request = request.get("booking_request", {})
-            itinerary = request.get("itinerary", {})
-            
-            # Initialize response data
-            response_data = {
-                "query_type": query_type,
-                "booking_id": f"book_{int(datetime.utcnow().timestamp())}",
-                "timestamp": datetime.utcnow().isoformat(),
-                "booking_status": "processing"
-            }
-            
-            # Handle different booking types
-            if query_type in ["book", "booking", "flight"]:
-                booking_result = await self._process_flight_booking(booking_request, itinerary)
-                response_data["flight_booking"] = booking_result
-            
-            elif query_type == "hotel":
-                hotel_result = await self._process_hotel_booking(booking_request, itinerary)
-                response_data["hotel_booking"] = hotel_result
-            
-            elif query_type == "payment":
-                payment_result = await self._process_payment(booking_request)
-                response_data["payment"] = payment_result
-            
-            elif query_type == "search":
-                search_result = await self._search_bookings(booking_request)
-                response_data["search_results"] = search_result
-            
-            elif query_type == "availability":
-                availability_result = await self._check_availability(booking_request)
-                response_data["availability"] = availability_result
-            
-            elif query_type == "confirm":
-                confirm_result = await self._confirm_booking(booking_request)
-                response_data["confirmation"] = confirm_result
-            
-            elif query_type == "cancel":
-                cancel_result = await self._cancel_booking(booking_request)
-                response_data["cancellation"] = cancel_result
-            
-            # Calculate booking confidence
-            response_data["confidence"] = self._calculate_booking_confidence(response_data)
-            
+        query_type = request.get("type", "book")
+        booking_request = request.get("booking_request", {})
+        itinerary = request.get("itinerary", {})
+        
+        # Reject bad input up front, before any handler or scoring work
+        if query_type not in _VALID_TYPES:
             return AgentResponse(
-                success=True,
-                data=response_data,
-                metadata={
-                    "agent": self.name,
-                    "processing_time": datetime.utcnow().isoformat(),
-                    "capabilities_used": self._get_used_capabilities(request),
-                    "booking_quality": self._assess_booking_quality(response_data)
-                }
+                success=False,
+                error=f"Unsupported booking request type: {query_type}",
+                metadata={"agent": self.name}
             )
-            
+        validation_error = _booking_request_error(booking_request)
+        if validation_error is not None:
+            return AgentResponse(
+                success=False,
+                error=f"Invalid booking request: {validation_error}",
+                metadata={"agent": self.name}
+            )
+        
+        # Read the clock once and share it across every helper
+        now = datetime.utcnow()
+        now_iso = now.isoformat()
+        
+        # Initialize response data
+        response_data = {
+            "query_type": query_type,
+            "booking_id": f"book_{next(_id_counter)}",
+            "timestamp": now_iso,
+            "booking_status": "processing"
+        }
+        
+        # Dispatch to the handler registered for this booking type
+        handler_name, response_key, _ = self._HANDLERS[query_type]
+        try:
+            result = await getattr(self, handler_name)(booking_request, itinerary, now)
         except Exception as e:
             return AgentResponse(
                 success=False,
                 error=f"Booker agent error: {str(e)}",
                 metadata={"agent": self.name}
             )
+        
+        if response_key is None:
+            response_data.update(result)
+        else:
+            response_data[response_key] = result
+        
+        # Calculate booking confidence and quality
+        response_data["confidence"], booking_quality = self._summarize(response_data)
+        
+        return AgentResponse(
+            success=True,
+            data=response_data,
+            metadata={
+                "agent": self.name,
+                "processing_time": now_iso,
+                "capabilities_used": self._get_used_capabilities(request),
+                "booking_quality": booking_quality
+            }
+        )
     
-    async def _process_flight_booking(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_flight_booking(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Process flight booking using real Amadeus API"""
         try:
-            # Always use mock for now since Amadeus API requires valid credentials
-            # To enable real Amadeus integration:
-            # 1. Get API credentials from https://developers.amadeus.com/
-            # 2. Add AMADEUS_CLIENT_ID and AMADEUS_CLIENT_SECRET to .env
-            # 3. Uncomment the code below and remove the mock return
+            if not _AMADEUS_ENABLED:
+                return self._create_mock_flight_booking(booking_request, now)
             
-            if not amadeus:
-                print("Amadeus API not configured, using mock booking")
-                return self._create_mock_flight_booking(booking_request)
-            
-            # For now, always use mock to avoid authentication errors
-            print("Using mock flight booking (Amadeus credentials not configured)")
-            return self._create_mock_flight_booking(booking_request)
-            
-            # Uncomment this section when Amadeus credentials are properly configured:
-            # # Extract flight details from booking request
-            # origin = booking_request.get("origin", "")
-            # destination = booking_request.get("destination", "")
-            # departure_date = booking_request.get("departure_date", "")
-            # return_date = booking_request.get("return_date")
-            # passengers = booking_request.get("passengers", 1)
-            # 
-            # async with amadeus as flights:
-            #     # Search for flights
-            #     flight_results = await flights.search_flights(
-            #         origin=origin,
-            #         destination=destination,
-            #         departure_date=departure_date,
-            #         return_date=return_date,
-            #         adults=passengers
-            #     )
-            #     
-            #     if not flight_results:
-            #         return {
-            #             "status": "no_flights_found",
-            #             "message": "No flights available for the specified criteria",
-            #             "alternatives": await self._suggest_alternatives(booking_request)
-            #         }
-            #     
-            #     # Select best flight (for demo, select first one)
-            #     selected_flight = flight_results[0]
-            #     
-            #     # Create booking
-            #     booking = {
-            #         "booking_id": f"flight_{int(datetime.utcnow().timestamp())}",
-            #         "flight": selected_flight,
-            #         "passengers": passengers,
-            #         "total_price": selected_flight.price,
-            #         "currency": selected_flight.currency,
-            #         "booking_status": "confirmed",
-            #         "confirmation_code": f"FL{int(datetime.utcnow().timestamp())}",
-            #         "booking_time": datetime.utcnow().isoformat(),
-            #         "terms_and_conditions": "Standard airline terms apply"
-            #     }
-            #     
-            #     return booking
+            from .improved_booker_real import book_flight_real
+            booking = await book_flight_real(booking_request, now, next(_id_counter))
+            if booking is None:
+                return {
+                    "status": "no_flights_found",
+                    "message": "No flights available for the specified criteria",
+                    "alternatives": await self._suggest_alternatives(booking_request)
+                }
+            return booking
         
         except Exception as e:
             print(f"Error processing flight booking: {e}")
             # Always fallback to mock on error
-            return self._create_mock_flight_booking(booking_request)
+            return self._create_mock_flight_booking(booking_request, now)
+    
+    async def _process_trip_booking(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Book flight, hotel and payment concurrently for a whole trip"""
+        sections = ("flight_booking", "hotel_booking", "payment")
+        results = await asyncio.gather(
+            self._process_flight_booking(booking_request, itinerary, now),
+            self._process_hotel_booking(booking_request, itinerary, now),
+            self._process_payment(booking_request, itinerary, now),
+            return_exceptions=True
+        )
+        
+        trip = {}
+        for section, result in zip(sections, results, strict=True):
+            if isinstance(result, Exception):
+                print(f"Error processing trip {section}: {result}")
+                result = {
+                    "status": "error",
+                    "message": f"{section} failed: {str(result)}"
+                }
+            trip[section] = result
+        return trip
     
-    async def _process_hotel_booking(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_hotel_booking(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Process hotel booking"""
         try:
             # This would integrate with hotel booking APIs like Booking.com, Expedia, etc.
@@ -185,10 +335,11 @@ class ImprovedBookerAgent(BaseAgent):
             check_out = booking_request.get("check_out", "")
             guests = booking_request.get("guests", 1)
             rooms = booking_request.get("rooms", 1)
+            seq = next(_id_counter)
             
             # Mock hotel booking (replace with real API integration)
             hotel_booking = {
-                "booking_id": f"hotel_{int(datetime.utcnow().timestamp())}",
+                "booking_id": f"hotel_{seq}",
                 "hotel": {
                     "name": f"Premium Hotel in {destination}",
                     "rating": 4.5,
@@ -200,11 +351,11 @@ class ImprovedBookerAgent(BaseAgent):
                 "check_out": check_out,
                 "guests": guests,
                 "rooms": rooms,
-                "total_price": 150 * (datetime.fromisoformat(check_out) - datetime.fromisoformat(check_in)).days,
+                "total_price": 150 * _stay_nights(check_in, check_out),
                 "currency": "USD",
                 "booking_status": "confirmed",
-                "confirmation_code": f"HT{int(datetime.utcnow().timestamp())}",
-                "booking_time": datetime.utcnow().isoformat(),
+                "confirmation_code": f"HT{seq}",
+                "booking_time": now.isoformat(),
                 "cancellation_policy": "Free cancellation up to 24 hours before check-in"
             }
             
@@ -218,52 +369,20 @@ class ImprovedBookerAgent(BaseAgent):
                 "fallback_available": True
             }
     
-    async def _process_payment(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_payment(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Process payment using real Stripe API"""
         try:
-            if not stripe_api:
-                print("Stripe API not configured, using mock payment")
-                return self._create_mock_payment(booking_request)
+            if not _STRIPE_ENABLED:
+                return self._create_mock_payment(booking_request, now)
             
-            # Always use mock for now to avoid authentication errors
-            print("Using mock payment (Stripe credentials not configured)")
-            return self._create_mock_payment(booking_request)
-            
-            # Uncomment when Stripe is properly configured:
-            # amount = booking_request.get("amount", 0)
-            # currency = booking_request.get("currency", "usd")
-            # description = booking_request.get("description", "Travel booking payment")
-            # metadata = booking_request.get("metadata", {})
-            # 
-            # async with stripe_api as payments:
-            #     # Create payment intent
-            #     payment_intent = await payments.create_payment_intent(
-            #         amount=amount,
-            #         currency=currency,
-            #         description=description,
-            #         metadata=metadata
-            #     )
-            #     
-            #     # Confirm payment (in real scenario, this would be done after user confirmation)
-            #     if payment_intent.get("status") == "requires_confirmation":
-            #         confirmed_payment = await payments.confirm_payment(payment_intent["id"])
-            #         payment_intent = confirmed_payment
-            #     
-            #     return {
-            #         "payment_id": payment_intent.get("id"),
-            #         "status": payment_intent.get("status"),
-            #         "amount": amount,
-            #         "currency": currency,
-            #         "client_secret": payment_intent.get("client_secret"),
-            #         "payment_method": payment_intent.get("payment_method"),
-            #         "created_at": datetime.utcnow().isoformat()
-            #     }
+            from .improved_booker_real import pay_real
+            return await pay_real(booking_request, now)
         
         except Exception as e:
             print(f"Error processing payment: {e}")
-            return self._create_mock_payment(booking_request)
+            return self._create_mock_payment(booking_request, now)
     
-    async def _search_bookings(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _search_bookings(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Search for available bookings"""
         try:
             search_type = booking_request.get("search_type", "flights")
@@ -271,9 +390,9 @@ class ImprovedBookerAgent(BaseAgent):
             date = booking_request.get("date", "")
             
             if search_type == "flights":
-                return await self._search_flights(booking_request)
+                return await self._search_flights(booking_request, now)
             elif search_type == "hotels":
-                return await self._search_hotels(booking_request)
+                return await self._search_hotels(booking_request, now)
             else:
                 return {
                     "status": "error",
@@ -287,55 +406,56 @@ class ImprovedBookerAgent(BaseAgent):
                 "message": f"Search failed: {str(e)}"
             }
     
-    async def _search_flights(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
-        """Search for flights"""
-        try:
-            if not amadeus:
-                return self._create_mock_flight_search(booking_request)
-            
-            # Always use mock for now to avoid authentication errors
-            print("Using mock flight search (Amadeus credentials not configured)")
-            return self._create_mock_flight_search(booking_request)
-            
-            # Uncomment when Amadeus is properly configured:
-            # origin = booking_request.get("origin", "")
-            # destination = booking_request.get("destination", "")
-            # departure_date = booking_request.get("departure_date", "")
-            # 
-            # async with amadeus as flights:
-            #     flight_results = await flights.search_flights(
-            #         origin=origin,
-            #         destination=destination,
-            #         departure_date=departure_date
-            #     )
-            #     
-            #     return {
-            #         "search_id": f"search_{int(datetime.utcnow().timestamp())}",
-            #         "flights": [
-            #             {
-            #                 "id": flight.id,
-            #                 "airline": flight.airline,
-            #                 "flight_number": flight.flight_number,
-            #                 "origin": flight.origin,
-            #                 "destination": flight.destination,
-            #                 "departure_time": flight.departure_time.isoformat(),
-            #                 "arrival_time": flight.arrival_time.isoformat(),
-            #                 "duration": flight.duration,
-            #                 "price": flight.price,
-            #                 "currency": flight.currency,
-            #                 "stops": flight.stops
-            #             } for flight in flight_results
-            #         ],
-            #         "total_results": len(flight_results),
-            #         "search_time": datetime.utcnow().isoformat()
-            #     }
+    async def _search_flights(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Search for flights, serving repeated queries from the TTL cache"""
+        key = cache_key(
+            "flights",
+            origin=booking_request.get("origin", ""),
+            destination=booking_request.get("destination", ""),
+            departure_date=booking_request.get("departure_date", ""),
+            passengers=booking_request.get("passengers", 1)
+        )
+        cached = _flight_search_cache.get(key)
+        if cached is not None:
+            return cached
         
+        try:
+            result = await self._fetch_flights(booking_request, now)
         except Exception as e:
             print(f"Error searching flights: {e}")
-            return self._create_mock_flight_search(booking_request)
+            # Fall back to mock results, leaving the failure uncached
+            return self._create_mock_flight_search(booking_request, now)
+        
+        _cache_search_result(_flight_search_cache, key, result)
+        return result
     
-    async def _search_hotels(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
-        """Search for hotels"""
+    async def _fetch_flights(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Run a flight search against the upstream API (or mock)"""
+        if not _AMADEUS_ENABLED:
+            return self._create_mock_flight_search(booking_request, now)
+        
+        from .improved_booker_real import search_flights_real
+        return await search_flights_real(booking_request, now, next(_id_counter))
+    
+    async def _search_hotels(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Search for hotels, serving repeated queries from the TTL cache"""
+        key = cache_key(
+            "hotels",
+            destination=booking_request.get("destination", ""),
+            check_in=booking_request.get("check_in", ""),
+            check_out=booking_request.get("check_out", ""),
+            guests=booking_request.get("guests", 1)
+        )
+        cached = _hotel_search_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = await self._fetch_hotels(booking_request, now)
+        _cache_search_result(_hotel_search_cache, key, result)
+        return result
+    
+    async def _fetch_hotels(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Run a hotel search against the upstream API (or mock)"""
         try:
             # Mock hotel search (replace with real API integration)
             destination = booking_request.get("destination", "")
@@ -355,10 +475,10 @@ class ImprovedBookerAgent(BaseAgent):
             ]
             
             return {
-                "search_id": f"hotel_search_{int(datetime.utcnow().timestamp())}",
+                "search_id": f"hotel_search_{next(_id_counter)}",
                 "hotels": mock_hotels,
                 "total_results": len(mock_hotels),
-                "search_time": datetime.utcnow().isoformat()
+                "search_time": now.isoformat()
             }
         
         except Exception as e:
@@ -368,15 +488,33 @@ class ImprovedBookerAgent(BaseAgent):
                 "message": f"Hotel search failed: {str(e)}"
             }
     
-    async def _check_availability(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _check_availability(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Check availability for bookings"""
         try:
             booking_type = booking_request.get("booking_type", "flight")
             
-            if booking_type == "flight":
-                return await self._check_flight_availability(booking_request)
-            elif booking_type == "hotel":
-                return await self._check_hotel_availability(booking_request)
+            if booking_type in ("flight", "hotel"):
+                key = cache_key(
+                    "availability",
+                    booking_type=booking_type,
+                    booking_id=booking_request.get("booking_id", ""),
+                    origin=booking_request.get("origin", ""),
+                    destination=booking_request.get("destination", ""),
+                    date=booking_request.get("date") or booking_request.get("departure_date") or booking_request.get("check_in", ""),
+                    passengers=booking_request.get("passengers") or booking_request.get("guests", 1)
+                )
+                cached = _availability_cache.get(key)
+                if cached is not None:
+                    return cached
+                
+                if booking_type == "flight":
+                    result = await self._check_flight_availability(booking_request, now)
+                else:
+                    result = await self._check_hotel_availability(booking_request, now)
+                
+                if result.get("available"):
+                    _availability_cache.set(key, result)
+                return result
             else:
                 return {
                     "status": "error",
@@ -390,7 +528,7 @@ class ImprovedBookerAgent(BaseAgent):
                 "message": f"Availability check failed: {str(e)}"
             }
     
-    async def _check_flight_availability(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _check_flight_availability(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Check flight availability"""
         try:
             # This would use real API to check availability
@@ -398,7 +536,7 @@ class ImprovedBookerAgent(BaseAgent):
                 "available": True,
                 "seats_remaining": 5,
                 "price_changes": False,
-                "last_checked": datetime.utcnow().isoformat()
+                "last_checked": now.isoformat()
             }
         
         except Exception as e:
@@ -408,7 +546,7 @@ class ImprovedBookerAgent(BaseAgent):
                 "error": str(e)
             }
     
-    async def _check_hotel_availability(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _check_hotel_availability(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Check hotel availability"""
         try:
             # This would use real API to check availability
@@ -416,7 +554,7 @@ class ImprovedBookerAgent(BaseAgent):
                 "available": True,
                 "rooms_remaining": 3,
                 "price_changes": False,
-                "last_checked": datetime.utcnow().isoformat()
+                "last_checked": now.isoformat()
             }
         
         except Exception as e:
@@ -426,18 +564,31 @@ class ImprovedBookerAgent(BaseAgent):
                 "error": str(e)
             }
     
-    async def _confirm_booking(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _confirm_booking(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Confirm a booking"""
         try:
             booking_id = booking_request.get("booking_id", "")
             booking_type = booking_request.get("booking_type", "flight")
             
-            # Mock confirmation (replace with real API integration)
+            # Bookings that fell back to the mock were never placed with Amadeus
+            if (_AMADEUS_ENABLED and booking_type == "flight" and booking_id
+                    and not booking_id.startswith(_MOCK_ID_PREFIX)):
+                try:
+                    status = await asyncio.wait_for(
+                        self._poll_booking_status(booking_id),
+                        timeout=CONFIRMATION_DEADLINE
+                    )
+                except asyncio.TimeoutError:
+                    status = "pending"
+            else:
+                # Mock confirmation (replace with real API integration)
+                status = "confirmed"
+            
             return {
                 "booking_id": booking_id,
-                "status": "confirmed",
-                "confirmation_code": f"CONF{int(datetime.utcnow().timestamp())}",
-                "confirmed_at": datetime.utcnow().isoformat(),
+                "status": status,
+                "confirmation_code": f"CONF{next(_id_counter)}",
+                "confirmed_at": now.isoformat(),
                 "booking_type": booking_type,
                 "next_steps": [
                     "Check your email for confirmation details",
@@ -453,7 +604,17 @@ class ImprovedBookerAgent(BaseAgent):
                 "message": f"Confirmation failed: {str(e)}"
             }
     
-    async def _cancel_booking(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    async def _poll_booking_status(self, booking_id: str) -> str:
+        """Poll Amadeus on the escalating schedule until the order settles"""
+        attempt = 0
+        while True:
+            status = await amadeus.get_booking_status(booking_id)
+            if status in _FINAL_BOOKING_STATUSES:
+                return status
+            await asyncio.sleep(_poll_delay(attempt))
+            attempt += 1
+    
+    async def _cancel_booking(self, booking_request: Dict[str, Any], itinerary: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Cancel a booking"""
         try:
             booking_id = booking_request.get("booking_id", "")
@@ -463,8 +624,8 @@ class ImprovedBookerAgent(BaseAgent):
             return {
                 "booking_id": booking_id,
                 "status": "cancelled",
-                "cancellation_code": f"CANCEL{int(datetime.utcnow().timestamp())}",
-                "cancelled_at": datetime.utcnow().isoformat(),
+                "cancellation_code": f"CANCEL{next(_id_counter)}",
+                "cancelled_at": now.isoformat(),
                 "refund_amount": 0,  # Would calculate based on cancellation policy
                 "refund_processing_time": "3-5 business days",
                 "cancellation_reason": cancellation_reason
@@ -479,146 +640,96 @@ class ImprovedBookerAgent(BaseAgent):
     
     async def _suggest_alternatives(self, booking_request: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Suggest alternative booking options"""
-        return [
-            {
-                "type": "alternative_dates",
-                "suggestion": "Try different departure dates",
-                "description": "Flights may be available on nearby dates"
-            },
-            {
-                "type": "alternative_airports",
-                "suggestion": "Consider nearby airports",
-                "description": "Check flights from nearby airports for better availability"
-            },
-            {
-                "type": "alternative_destinations",
-                "suggestion": "Explore similar destinations",
-                "description": "Consider alternative destinations with similar attractions"
-            }
-        ]
+        return list(self._ALTERNATIVES)
     
-    def _create_mock_flight_booking(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_mock_flight_booking(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Create mock flight booking for fallback"""
+        seq = next(_id_counter)
         return {
-            "booking_id": f"mock_flight_{int(datetime.utcnow().timestamp())}",
-            "flight": {
-                "id": "mock_flight_123",
-                "airline": "Mock Airlines",
-                "flight_number": "MA123",
+            "booking_id": f"mock_flight_{seq}",
+            "flight": _MOCK_FLIGHT_BASE | {
                 "origin": booking_request.get("origin", "JFK"),
                 "destination": booking_request.get("destination", "LAX"),
-                "departure_time": datetime.utcnow() + timedelta(days=1),
-                "arrival_time": datetime.utcnow() + timedelta(days=1, hours=5),
-                "duration": "5h 30m",
-                "price": 299.99,
-                "currency": "USD",
-                "stops": 0
+                "departure_time": now + timedelta(days=1),
+                "arrival_time": now + timedelta(days=1, hours=5)
             },
             "passengers": booking_request.get("passengers", 1),
-            "total_price": 299.99,
-            "currency": "USD",
-            "booking_status": "confirmed",
-            "confirmation_code": f"MOCK{int(datetime.utcnow().timestamp())}",
-            "booking_time": datetime.utcnow().isoformat(),
-            "terms_and_conditions": "Mock booking - for testing purposes only"
-        }
+            "confirmation_code": f"MOCK{seq}",
+            "booking_time": now.isoformat()
+        } | _MOCK_BOOKING_BASE
     
-    def _create_mock_payment(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_mock_payment(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Create mock payment for fallback"""
-        return {
-            "payment_id": f"mock_pay_{int(datetime.utcnow().timestamp())}",
-            "status": "succeeded",
+        seq = next(_id_counter)
+        return _MOCK_PAYMENT_BASE | {
+            "payment_id": f"mock_pay_{seq}",
             "amount": booking_request.get("amount", 0),
             "currency": booking_request.get("currency", "usd"),
-            "client_secret": f"mock_secret_{int(datetime.utcnow().timestamp())}",
-            "payment_method": "mock_card",
-            "created_at": datetime.utcnow().isoformat()
+            "client_secret": f"mock_secret_{seq}",
+            "created_at": now.isoformat()
         }
     
-    def _create_mock_flight_search(self, booking_request: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_mock_flight_search(self, booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """Create mock flight search results"""
+        # Hoist per-search values out of the per-flight loop
+        base = now + timedelta(days=1)
+        flight_time = timedelta(hours=5)
+        origin = booking_request.get("origin", "JFK")
+        destination = booking_request.get("destination", "LAX")
+        
+        flights = []
+        for i in range(3):
+            departure = base + timedelta(hours=i)
+            flights.append({
+                "id": f"mock_flight_{i}",
+                "airline": f"Mock Airlines {i+1}",
+                "flight_number": f"MA{i+1}23",
+                "origin": origin,
+                "destination": destination,
+                "departure_time": departure.isoformat(),
+                "arrival_time": (departure + flight_time).isoformat(),
+                "duration": _MOCK_FLIGHT_BASE["duration"],
+                "price": 299.99 + (i * 50),
+                "currency": _MOCK_FLIGHT_BASE["currency"],
+                "stops": i
+            })
+        
         return {
-            "search_id": f"mock_search_{int(datetime.utcnow().timestamp())}",
-            "flights": [
-                {
-                    "id": f"mock_flight_{i}",
-                    "airline": f"Mock Airlines {i+1}",
-                    "flight_number": f"MA{i+1}23",
-                    "origin": booking_request.get("origin", "JFK"),
-                    "destination": booking_request.get("destination", "LAX"),
-                    "departure_time": (datetime.utcnow() + timedelta(days=1, hours=i)).isoformat(),
-                    "arrival_time": (datetime.utcnow() + timedelta(days=1, hours=i+5)).isoformat(),
-                    "duration": "5h 30m",
-                    "price": 299.99 + (i * 50),
-                    "currency": "USD",
-                    "stops": i
-                } for i in range(3)
-            ],
-            "total_results": 3,
-            "search_time": datetime.utcnow().isoformat()
+            "search_id": f"mock_search_{next(_id_counter)}",
+            "flights": flights,
+            "total_results": len(flights),
+            "search_time": now.isoformat()
         }
     
-    def _calculate_booking_confidence(self, response_data: Dict[str, Any]) -> float:
-        """Calculate confidence score for the booking response"""
-        confidence_factors = []
-        
-        # Check if booking was successful
-        if "flight_booking" in response_data and response_data["flight_booking"].get("booking_status") == "confirmed":
-            confidence_factors.append(0.9)
+    def _summarize(self, response_data: Dict[str, Any]) -> Tuple[float, str]:
+        """Score confidence and grade quality of a booking response in one pass"""
+        flight = response_data.get("flight_booking")
+        hotel = response_data.get("hotel_booking")
+        payment = response_data.get("payment")
+        search = response_data.get("search_results")
         
-        if "hotel_booking" in response_data and response_data["hotel_booking"].get("booking_status") == "confirmed":
-            confidence_factors.append(0.9)
+        confidence_factors = tuple(factor for factor, hit in (
+            (0.9, flight is not None and flight.get("booking_status") == "confirmed"),
+            (0.9, hotel is not None and hotel.get("booking_status") == "confirmed"),
+            (0.95, payment is not None and payment.get("status") == "succeeded"),
+            (0.8, search is not None and search.get("total_results", 0) > 0)
+        ) if hit)
+        confidence = sum(confidence_factors) / len(confidence_factors) if confidence_factors else 0.5
         
-        if "payment" in response_data and response_data["payment"].get("status") == "succeeded":
-            confidence_factors.append(0.95)
-        
-        # Check for real API usage
-        if "search_results" in response_data and response_data["search_results"].get("total_results", 0) > 0:
-            confidence_factors.append(0.8)
-        
-        if confidence_factors:
-            return sum(confidence_factors) / len(confidence_factors)
-        
-        return 0.5
-    
-    def _assess_booking_quality(self, response_data: Dict[str, Any]) -> str:
-        """Assess the quality of the booking response"""
-        if "flight_booking" in response_data and "hotel_booking" in response_data and "payment" in response_data:
-            return "excellent"
-        elif "flight_booking" in response_data or "hotel_booking" in response_data:
-            return "good"
-        elif "search_results" in response_data:
-            return "fair"
+        if flight is not None and hotel is not None and payment is not None:
+            quality = "excellent"
+        elif flight is not None or hotel is not None:
+            quality = "good"
+        elif search is not None:
+            quality = "fair"
         else:
-            return "poor"
-    
-    def _get_used_capabilities(self, request: Dict[str, Any]) -> List[str]:
-        """Get list of capabilities used for this request"""
-        capabilities = []
-        query_type = request.get("type", "")
-        
-        if query_type in ["book", "booking", "flight"]:
-            capabilities.extend(["flight_booking", "payment_processing", "confirmation_handling"])
-        
-        if query_type == "hotel":
-            capabilities.extend(["hotel_booking", "payment_processing", "confirmation_handling"])
+            quality = "poor"
         
-        if query_type == "payment":
-            capabilities.append("payment_processing")
-        
-        if query_type == "search":
-            capabilities.extend(["price_comparison", "availability_checking"])
-        
-        if query_type == "availability":
-            capabilities.append("availability_checking")
-        
-        if query_type == "confirm":
-            capabilities.append("confirmation_handling")
-        
-        if query_type == "cancel":
-            capabilities.append("cancellation_processing")
-        
-        return capabilities
+        return confidence, quality
+    
+    def _get_used_capabilities(self, request: Dict[str, Any]) -> Tuple[str, ...]:
+        """Get the capabilities used for this request (shared, immutable)"""
+        return self._CAPS_BY_TYPE.get(request.get("type", ""), ())
 
 # Create the improved booker agent instance
 improved_booker_agent = ImprovedBookerAgent()
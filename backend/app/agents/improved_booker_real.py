@@ -0,0 +1,106 @@
+"""
+Real API paths for the Improved Booker Agent
+
+Amadeus and Stripe calls used by the booker once credentials are configured.
+Kept out of improved_booker_agent so the default mock path does not load
+them; the booker imports this module lazily on first real call.
+
+To enable:
+1. Get API credentials from https://developers.amadeus.com/ and Stripe
+2. Add AMADEUS_CLIENT_ID, AMADEUS_CLIENT_SECRET and STRIPE_SECRET_KEY to .env
+"""
+
+from typing import Dict, Any, Optional
+from datetime import datetime
+from .real_apis import amadeus, stripe_api
+
+async def book_flight_real(booking_request: Dict[str, Any], now: datetime, seq: int) -> Optional[Dict[str, Any]]:
+    """Search Amadeus and book the best flight, or None if nothing matched"""
+    origin = booking_request.get("origin", "")
+    destination = booking_request.get("destination", "")
+    departure_date = booking_request.get("departure_date", "")
+    return_date = booking_request.get("return_date")
+    passengers = booking_request.get("passengers", 1)
+
+    # Search for flights
+    flight_results = await amadeus.search_flights(
+        origin=origin,
+        destination=destination,
+        departure_date=departure_date,
+        return_date=return_date,
+        adults=passengers
+    )
+
+    if not flight_results:
+        return None
+
+    # Select best flight (for demo, select first one)
+    selected_flight = flight_results[0]
+
+    return {
+        "booking_id": f"flight_{seq}",
+        "flight": selected_flight,
+        "passengers": passengers,
+        "total_price": selected_flight.price,
+        "currency": selected_flight.currency,
+        "booking_status": "confirmed",
+        "confirmation_code": f"FL{seq}",
+        "booking_time": now.isoformat(),
+        "terms_and_conditions": "Standard airline terms apply"
+    }
+
+async def search_flights_real(booking_request: Dict[str, Any], now: datetime, seq: int) -> Dict[str, Any]:
+    """Search Amadeus for flights matching the request"""
+    flight_results = await amadeus.search_flights(
+        origin=booking_request.get("origin", ""),
+        destination=booking_request.get("destination", ""),
+        departure_date=booking_request.get("departure_date", "")
+    )
+
+    return {
+        "search_id": f"search_{seq}",
+        "flights": [
+            {
+                "id": flight.id,
+                "airline": flight.airline,
+                "flight_number": flight.flight_number,
+                "origin": flight.origin,
+                "destination": flight.destination,
+                "departure_time": flight.departure_time.isoformat(),
+                "arrival_time": flight.arrival_time.isoformat(),
+                "duration": flight.duration,
+                "price": flight.price,
+                "currency": flight.currency,
+                "stops": flight.stops
+            } for flight in flight_results
+        ],
+        "total_results": len(flight_results),
+        "search_time": now.isoformat()
+    }
+
+async def pay_real(booking_request: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Create (and, where required, confirm) a Stripe payment intent"""
+    amount = booking_request.get("amount", 0)
+    currency = booking_request.get("currency", "usd")
+
+    # Create payment intent
+    payment_intent = await stripe_api.create_payment_intent(
+        amount=amount,
+        currency=currency,
+        description=booking_request.get("description", "Travel booking payment"),
+        metadata=booking_request.get("metadata", {})
+    )
+
+    # Confirm payment (in real scenario, this would be done after user confirmation)
+    if payment_intent.get("status") == "requires_confirmation":
+        payment_intent = await stripe_api.confirm_payment(payment_intent["id"])
+
+    return {
+        "payment_id": payment_intent.get("id"),
+        "status": payment_intent.get("status"),
+        "amount": amount,
+        "currency": currency,
+        "client_secret": payment_intent.get("client_secret"),
+        "payment_method": payment_intent.get("payment_method"),
+        "created_at": now.isoformat()
+    }
@@ -9,16 +9,350 @@ This agent provides real trip planning capabilities using:
 - Activity scheduling
 """
 
-import asyncio
+import hashlib
 import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
-from .base_agent import BaseAgent, AgentResponse
-from app.core.llm import call_llm, call_llm_async
+import logging
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from .base_agent import BaseAgent, AgentResponse, dumps_json, loads_json
+from .ttl_cache import TTLCache
+from .event_emitter import emit_agent_event
+from app.core.llm import call_llm, call_llm_stream_async
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class NormalizedTripRequest:
+    """The trip request fields the planner reads, with defaults applied once"""
+    destination: str = "Unknown"
+    duration: int = 3
+    budget: float = 1000
+    travelers: int = 1
+    trip_type: str = "leisure"
+    interests: Tuple[str, ...] = ()
+    preferences: Dict[str, Any] = field(default_factory=dict)
+    trip_id: Optional[str] = None
+    
+    @classmethod
+    def from_request(cls, trip_request: Dict[str, Any]) -> "NormalizedTripRequest":
+        """Normalize a raw trip_request dict; missing keys take the defaults"""
+        fields = {name: trip_request[name] for name in _TRIP_FIELDS if name in trip_request}
+        if "interests" in fields:
+            fields["interests"] = tuple(fields["interests"] or ())
+        return cls(**fields)
+
+_TRIP_FIELDS = tuple(NormalizedTripRequest.__dataclass_fields__)
+
+# Research blobs are usually the same result reused from the orchestrator's
+# cache, so keep their pretty-printed form for as long as that cache does
+RESEARCH_JSON_TTL = 300
+_research_json_cache = TTLCache(ttl=RESEARCH_JSON_TTL, maxsize=256)
+
+def _research_json(research_data: Dict[str, Any]) -> str:
+    """Pretty-print research data for the prompt, reusing identical blobs"""
+    key = hashlib.blake2b(dumps_json(research_data, sort_keys=True), digest_size=16).digest()
+    research_json = _research_json_cache.get(key)
+    if research_json is None:
+        research_json = dumps_json(research_data, indent=True).decode()
+        _research_json_cache.set(key, research_json)
+    return research_json
+
+_TRIP_CONTEXT_TEMPLATE = (
+    "Trip Details:\n"
+    "- Destination: {destination}\n"
+    "- Duration: {duration} days\n"
+    "- Budget: ${budget}\n"
+    "- Travelers: {travelers}\n"
+    "- Trip Type: {trip_type}"
+)
+_INTERESTS_LINE = "\n- Interests: "
+_RESEARCH_CONTEXT_HEADER = "\n\nResearch Data:"
+_ATTRACTIONS_LINE = "\n- Attractions: {} found"
+_WEATHER_LINE = "\n- Weather: {}"
+
+def _schema_object(properties: Dict[str, Any], required: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    schema = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = list(required)
+    return schema
+
+_STRING = {"type": "string"}
+_NUMBER = {"type": "number"}
+_INTEGER = {"type": "integer"}
+
+# Structured-output schema for itinerary generation; the model is constrained
+# to it, so the prompt no longer has to spell out an example JSON document
+_ITINERARY_RESPONSE_SCHEMA = _schema_object({
+    "itinerary": _schema_object({
+        "overview": _schema_object({
+            "destination": _STRING,
+            "duration": _INTEGER,
+            "total_estimated_cost": _NUMBER,
+            "difficulty_level": _STRING,
+            "best_time_to_visit": _STRING
+        }),
+        "days": {"type": "array", "items": _schema_object({
+            "day": _INTEGER,
+            "date": _STRING,
+            "theme": _STRING,
+            "activities": {"type": "array", "items": _schema_object({
+                "time": _STRING,
+                "activity": _STRING,
+                "location": _STRING,
+                "duration": _STRING,
+                "cost": _NUMBER,
+                "description": _STRING,
+                "tips": _STRING
+            })},
+            "meals": {"type": "array", "items": _schema_object({
+                "time": _STRING,
+                "type": _STRING,
+                "restaurant": _STRING,
+                "cuisine": _STRING,
+                "cost": _NUMBER,
+                "reservation_required": {"type": "boolean"}
+            })},
+            "transportation": {"type": "array", "items": _schema_object({
+                "from": _STRING,
+                "to": _STRING,
+                "method": _STRING,
+                "duration": _STRING,
+                "cost": _NUMBER,
+                "tips": _STRING
+            })},
+            "daily_budget": _NUMBER,
+            "daily_tips": _STRING
+        }, required=("day", "activities", "meals"))}
+    }, required=("overview", "days"))
+}, required=("itinerary",))
+
+# Static instructions that follow the per-request context
+_ITINERARY_INSTRUCTIONS = """        Please create a comprehensive itinerary that includes:
+        1. Daily schedules with specific times
+        2. Activities and attractions for each day
+        3. Meal recommendations
+        4. Transportation between locations
+        5. Estimated costs for each activity
+        6. Time buffers for travel and rest
+        7. Alternative options for each day
+        8. Special considerations (weather, local customs, etc.)
+        
+        Return a JSON object matching the provided response schema.
+        
+        Make the itinerary practical, enjoyable, and within budget. Include specific recommendations and insider tips.
+        """
+
+# Anchored so a ```json fence anywhere wins over an earlier bare brace
+_JSON_BLOCK_RE = re.compile(r"(?:.*?```json(.*?)```|.*?(\{.*\}))", re.DOTALL)
+
+# Share of the total budget per category, in response order
+_BUDGET_SHARES = (
+    ("accommodation", 0.4),
+    ("food", 0.3),
+    ("activities", 0.2),
+    ("transportation", 0.1),
+)
+
+_MONEY_SAVING_TIPS = (
+    "Book accommodations in advance",
+    "Use public transportation",
+    "Eat at local restaurants",
+    "Look for free activities",
+    "Travel during off-peak seasons",
+)
+
+_SPLURGE_OPPORTUNITIES = (
+    "Special dining experiences",
+    "Unique local activities",
+    "Premium accommodations",
+    "Private tours",
+    "Souvenirs and local crafts",
+)
+
+# Budget-plan recommendations per tier; read-only so requests can share them
+_BUDGET_TIERS: Mapping[str, Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    "luxury": MappingProxyType({
+        "accommodation": ("Luxury hotels", "Boutique properties", "5-star resorts"),
+        "food": ("Fine dining restaurants", "Michelin-starred venues", "Private dining"),
+        "activities": ("Private tours", "Exclusive experiences", "VIP access"),
+        "transportation": ("Private transfers", "First-class train", "Car rental with driver"),
+        "money_saving_tips": _MONEY_SAVING_TIPS,
+        "splurge_opportunities": _SPLURGE_OPPORTUNITIES,
+    }),
+    "mid": MappingProxyType({
+        "accommodation": ("Mid-range hotels", "Business hotels", "Boutique B&Bs"),
+        "food": ("Mid-range restaurants", "Local favorites", "Food tours"),
+        "activities": ("Group tours", "Museum visits", "Cultural experiences"),
+        "transportation": ("Taxis", "Ride-sharing", "Car rental"),
+        "money_saving_tips": _MONEY_SAVING_TIPS,
+        "splurge_opportunities": _SPLURGE_OPPORTUNITIES,
+    }),
+    "budget": MappingProxyType({
+        "accommodation": ("Hostels", "Budget hotels", "Airbnb", "Guesthouses"),
+        "food": ("Street food", "Local markets", "Budget-friendly cafes", "Self-catering"),
+        "activities": ("Free walking tours", "Public parks", "Free museums", "Self-guided exploration"),
+        "transportation": ("Public transportation", "Walking", "Bicycle rental", "Shared rides"),
+        "money_saving_tips": _MONEY_SAVING_TIPS,
+        "splurge_opportunities": _SPLURGE_OPPORTUNITIES,
+    }),
+})
+
+def _budget_tier(budget: float) -> str:
+    if budget > 2000:
+        return "luxury"
+    if budget > 1000:
+        return "mid"
+    return "budget"
+
+_BASE_PACKING_ITEMS = (
+    "Passport/ID",
+    "Travel documents",
+    "Phone and charger",
+    "Camera",
+    "Clothes for the duration",
+    "Comfortable walking shoes",
+    "Toiletries",
+    "First aid kit",
+)
+_BEACH_KEYWORDS = frozenset({"beach", "coastal"})
+_BEACH_ITEMS = ("Sunscreen", "Swimsuit", "Beach towel", "Sunglasses")
+_MOUNTAIN_KEYWORDS = frozenset({"mountain", "mountains"})
+_MOUNTAIN_ITEMS = ("Hiking boots", "Backpack", "Water bottle", "Layers")
+_COLD_KEYWORDS = frozenset({"winter", "cold"})
+_COLD_ITEMS = ("Warm jacket", "Gloves", "Hat", "Thermal layers")
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+@lru_cache(maxsize=1024)
+def _packing_items(destination: str, trip_type: str) -> Tuple[str, ...]:
+    """Packing items for a destination and trip type, matched on whole words"""
+    words = frozenset(_WORD_RE.findall(destination.lower()))
+    items = _BASE_PACKING_ITEMS
+    
+    # Add destination-specific items
+    if words & _BEACH_KEYWORDS:
+        items += _BEACH_ITEMS
+    if words & _MOUNTAIN_KEYWORDS or 'hiking' in trip_type:
+        items += _MOUNTAIN_ITEMS
+    if words & _COLD_KEYWORDS:
+        items += _COLD_ITEMS
+    
+    return items
+
+# Enhancement content added to every itinerary. It is generic until
+# per-destination content exists; tuples keep the shared values immutable,
+# and callers copy at the boundary.
+_EMERGENCY_CONTACTS = (
+    ("emergency", "911"),
+    ("local_police", "Local emergency number"),
+    ("embassy", "Check embassy website"),
+    ("hospital", "Local hospital"),
+    ("tourist_helpline", "Local tourist information"),
+)
+_LOCAL_CUSTOMS_TIPS = (
+    "Research local customs before traveling",
+    "Learn basic phrases in the local language",
+    "Respect local dress codes",
+    "Be aware of tipping customs",
+    "Follow local dining etiquette",
+)
+_WEATHER_PREPARATION = (
+    "Check weather forecast before departure",
+    "Pack appropriate clothing layers",
+    "Bring weather protection (umbrella, raincoat)",
+    "Consider seasonal variations",
+    "Plan indoor alternatives for bad weather",
+)
+_SAFETY_TIPS = (
+    "Keep copies of important documents",
+    "Stay aware of your surroundings",
+    "Use hotel safes for valuables",
+    "Keep emergency contacts handy",
+    "Follow local safety guidelines",
+)
+
+_DAYS_KEY_RE = re.compile(r'"days"\s*:\s*$')
+
+class _DayStreamParser:
+    """Pick completed day objects out of a streamed itinerary response
+    
+    Tracks string/escape state and bracket depth over the raw LLM text. Once
+    the "days" array opens, every object that closes at the array's depth is
+    decoded and returned from feed().
+    """
+    
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._days_depth: Optional[int] = None
+        self._day_start: Optional[int] = None
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk and return the day objects it completed"""
+        self._text += chunk
+        text = self._text
+        days = []
+        
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._days_depth is None:
+                    if char == "[" and _DAYS_KEY_RE.search(text, max(0, i - 32), i):
+                        self._days_depth = self._depth + 1
+                elif char == "{" and self._depth == self._days_depth:
+                    self._day_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._days_depth is None:
+                    continue
+                if char == "}" and self._depth == self._days_depth and self._day_start is not None:
+                    try:
+                        days.append(loads_json(text[self._day_start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._day_start = None
+                elif char == "]" and self._depth < self._days_depth:
+                    # The days array closed; ignore any later arrays
+                    self._days_depth = -1
+        
+        self._pos = len(text)
+        return days
 
 class ImprovedPlannerAgent(BaseAgent):
     """Enhanced planner agent with real LLM integration and advanced planning"""
     
+    # Capabilities exercised by each request type
+    _CAPS_BY_TYPE: Dict[str, Tuple[str, ...]] = {
+        "plan": ("itinerary_generation", "activity_scheduling", "time_management"),
+        "planning": ("itinerary_generation", "activity_scheduling", "time_management"),
+        "itinerary": ("itinerary_generation", "activity_scheduling", "time_management"),
+        "budget_plan": ("budget_optimization", "accommodation_planning", "meal_planning"),
+        "optimize": ("route_optimization", "time_management"),
+        "customize": ("activity_scheduling", "meal_planning", "transportation_planning"),
+        "full": (
+            "itinerary_generation", "activity_scheduling", "time_management",
+            "budget_optimization", "accommodation_planning", "meal_planning",
+            "route_optimization"
+        ),
+    }
+    
     def __init__(self):
         super().__init__(
             name="planner",
@@ -41,52 +375,62 @@ class ImprovedPlannerAgent(BaseAgent):
         request_type = request.get("type", "")
         return request_type in [
             "plan", "planning", "itinerary", "schedule", 
-            "budget_plan", "optimize", "customize"
+            "budget_plan", "optimize", "customize", "full"
         ]
     
     async def process_request(self, request: Dict[str, Any]) -> AgentResponse:
         """Process a planning request with real LLM integration"""
+        now_iso = datetime.now(timezone.utc).isoformat()
         try:
             query_type = request.get("type", "plan")
-            trip_request = request.get("trip_request", {})
+            trip = NormalizedTripRequest.from_request(request.get("trip_request", {}))
             research_data = request.get("research_data", {})
+            session_id = request.get("context", {}).get("session_id")
             
             # Initialize response data
             response_data = {
                 "query_type": query_type,
-                "trip_id": trip_request.get("trip_id"),
-                "timestamp": datetime.utcnow().isoformat(),
+                "trip_id": trip.trip_id,
+                "timestamp": now_iso,
                 "planning_metadata": {}
             }
             
             # Generate itinerary based on request type
             if query_type in ["plan", "planning", "itinerary"]:
-                itinerary = await self._generate_itinerary(trip_request, research_data)
+                itinerary = await self._generate_itinerary(trip, research_data, now_iso, session_id)
                 response_data["itinerary"] = itinerary
             
             elif query_type == "budget_plan":
-                budget_plan = await self._create_budget_plan(trip_request, research_data)
+                budget_plan = await self._create_budget_plan(trip, research_data)
                 response_data["budget_plan"] = budget_plan
             
             elif query_type == "optimize":
-                optimized_plan = await self._optimize_itinerary(trip_request, research_data)
+                optimized_plan = await self._optimize_itinerary(trip, research_data)
                 response_data["optimized_plan"] = optimized_plan
             
             elif query_type == "customize":
-                customized_plan = await self._customize_itinerary(trip_request, research_data)
+                customized_plan = await self._customize_itinerary(trip, research_data)
                 response_data["customized_plan"] = customized_plan
             
-            # Calculate planning confidence
-            response_data["confidence"] = self._calculate_planning_confidence(response_data)
+            elif query_type == "full":
+                # Only the itinerary waits on the LLM; the budget and
+                # optimization plans are built in-process, so there is
+                # nothing to overlap them with
+                response_data["itinerary"] = await self._generate_itinerary(trip, research_data, now_iso, session_id)
+                response_data["budget_plan"] = await self._create_budget_plan(trip, research_data)
+                response_data["optimized_plan"] = await self._optimize_itinerary(trip, research_data)
+            
+            # Calculate planning confidence and quality
+            response_data["confidence"], planning_quality = self._summarize(response_data)
             
             return AgentResponse(
                 success=True,
                 data=response_data,
                 metadata={
                     "agent": self.name,
-                    "processing_time": datetime.utcnow().isoformat(),
+                    "processing_time": now_iso,
                     "capabilities_used": self._get_used_capabilities(request),
-                    "planning_quality": self._assess_planning_quality(response_data)
+                    "planning_quality": planning_quality
                 }
             )
             
@@ -97,36 +441,53 @@ class ImprovedPlannerAgent(BaseAgent):
                 metadata={"agent": self.name}
             )
     
-    async def _generate_itinerary(self, trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate a comprehensive itinerary using real LLM"""
+    async def _generate_itinerary(self, trip: NormalizedTripRequest, research_data: Dict[str, Any], now_iso: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Generate a comprehensive itinerary using real LLM
+        
+        The LLM response is streamed. With a session_id, each day is emitted
+        to the session's agent event stream as soon as the LLM completes it.
+        """
         try:
             # Prepare context for LLM
-            context = self._prepare_planning_context(trip_request, research_data)
+            context = self._prepare_planning_context(trip, research_data)
             
             # Create detailed prompt for LLM
-            prompt = self._create_itinerary_prompt(trip_request, research_data, context)
+            prompt = self._create_itinerary_prompt(trip, research_data, context)
             
-            # Call LLM to generate itinerary
-            llm_response = await call_llm_async(prompt)
+            # Stream the itinerary from the LLM, forwarding days as they complete
+            parser = _DayStreamParser() if session_id else None
+            chunks = []
+            async for chunk in call_llm_stream_async(prompt, _ITINERARY_RESPONSE_SCHEMA):
+                chunks.append(chunk)
+                if parser is not None:
+                    for day in parser.feed(chunk):
+                        await emit_agent_event(session_id, {
+                            "agent_type": "planner",
+                            "agent_name": "Planning Agent",
+                            "event_type": "result",
+                            "message": f"Day {day.get('day')} of the itinerary is ready",
+                            "data": {"day": day}
+                        })
+            if not chunks:
+                raise ValueError("No valid response received from the LLM")
             
             # Parse and structure the response
-            itinerary = self._parse_itinerary_response(llm_response, trip_request)
-            
-            # Enhance with additional planning
-            itinerary = await self._enhance_itinerary(itinerary, trip_request, research_data)
+            itinerary = self._parse_itinerary_response("".join(chunks), trip, now_iso)
+            itinerary["enhancements"] = self._build_enhancements(trip)
             
             return itinerary
             
-        except Exception as e:
-            print(f"Error generating itinerary: {e}")
-            return self._create_fallback_itinerary(trip_request)
+        except Exception:
+            logger.exception("Error generating itinerary")
+            return self._create_fallback_itinerary(trip)
     
-    async def _create_budget_plan(self, trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _create_budget_plan(self, trip: NormalizedTripRequest, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a detailed budget plan"""
         try:
-            budget = trip_request.get("budget", 1000)
-            duration = trip_request.get("duration", 3)
-            destination = trip_request.get("destination", "Unknown")
+            budget = trip.budget
+            duration = trip.duration
+            
+            tier = _BUDGET_TIERS[_budget_tier(budget)]
             
             # Create budget breakdown
             budget_plan = {
@@ -134,38 +495,24 @@ class ImprovedPlannerAgent(BaseAgent):
                 "duration_days": duration,
                 "daily_budget": budget / duration,
                 "categories": {
-                    "accommodation": {
-                        "budget": budget * 0.4,
-                        "daily": (budget * 0.4) / duration,
-                        "recommendations": self._get_accommodation_recommendations(budget, destination)
-                    },
-                    "food": {
-                        "budget": budget * 0.3,
-                        "daily": (budget * 0.3) / duration,
-                        "recommendations": self._get_food_recommendations(budget, destination)
-                    },
-                    "activities": {
-                        "budget": budget * 0.2,
-                        "daily": (budget * 0.2) / duration,
-                        "recommendations": self._get_activity_recommendations(budget, destination)
-                    },
-                    "transportation": {
-                        "budget": budget * 0.1,
-                        "daily": (budget * 0.1) / duration,
-                        "recommendations": self._get_transportation_recommendations(budget, destination)
+                    category: {
+                        "budget": budget * share,
+                        "daily": (budget * share) / duration,
+                        "recommendations": list(tier[category])
                     }
+                    for category, share in _BUDGET_SHARES
                 },
-                "money_saving_tips": self._get_money_saving_tips(budget, destination),
-                "splurge_opportunities": self._get_splurge_opportunities(budget, destination)
+                "money_saving_tips": list(tier["money_saving_tips"]),
+                "splurge_opportunities": list(tier["splurge_opportunities"])
             }
             
             return budget_plan
             
-        except Exception as e:
-            print(f"Error creating budget plan: {e}")
-            return self._create_fallback_budget_plan(trip_request)
+        except Exception:
+            logger.exception("Error creating budget plan")
+            return self._create_fallback_budget_plan(trip)
     
-    async def _optimize_itinerary(self, trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _optimize_itinerary(self, trip: NormalizedTripRequest, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize an existing itinerary"""
         try:
             # This would use optimization algorithms
@@ -186,14 +533,14 @@ class ImprovedPlannerAgent(BaseAgent):
             }
             
         except Exception as e:
-            print(f"Error optimizing itinerary: {e}")
+            logger.exception("Error optimizing itinerary")
             return {"error": str(e)}
     
-    async def _customize_itinerary(self, trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _customize_itinerary(self, trip: NormalizedTripRequest, research_data: Dict[str, Any]) -> Dict[str, Any]:
         """Customize itinerary based on preferences"""
         try:
-            preferences = trip_request.get("preferences", {})
-            interests = trip_request.get("interests", [])
+            preferences = trip.preferences
+            interests = list(trip.interests)
             
             # Create customized plan based on preferences
             customized_plan = {
@@ -211,37 +558,34 @@ class ImprovedPlannerAgent(BaseAgent):
             return customized_plan
             
         except Exception as e:
-            print(f"Error customizing itinerary: {e}")
+            logger.exception("Error customizing itinerary")
             return {"error": str(e)}
     
-    def _prepare_planning_context(self, trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> str:
+    def _prepare_planning_context(self, trip: NormalizedTripRequest, research_data: Dict[str, Any]) -> str:
         """Prepare context for LLM planning"""
-        context_parts = []
-        
-        # Trip details
-        context_parts.append(f"Trip Details:")
-        context_parts.append(f"- Destination: {trip_request.get('destination', 'Unknown')}")
-        context_parts.append(f"- Duration: {trip_request.get('duration', 3)} days")
-        context_parts.append(f"- Budget: ${trip_request.get('budget', 1000)}")
-        context_parts.append(f"- Travelers: {trip_request.get('travelers', 1)}")
-        context_parts.append(f"- Trip Type: {trip_request.get('trip_type', 'leisure')}")
+        context = _TRIP_CONTEXT_TEMPLATE.format(
+            destination=trip.destination,
+            duration=trip.duration,
+            budget=trip.budget,
+            travelers=trip.travelers,
+            trip_type=trip.trip_type
+        )
         
         # Interests and preferences
-        interests = trip_request.get('interests', [])
-        if interests:
-            context_parts.append(f"- Interests: {', '.join(interests)}")
+        if trip.interests:
+            context += _INTERESTS_LINE + ', '.join(trip.interests)
         
         # Research data
         if research_data:
-            context_parts.append(f"\nResearch Data:")
+            context += _RESEARCH_CONTEXT_HEADER
             if 'attractions' in research_data:
-                context_parts.append(f"- Attractions: {len(research_data['attractions'])} found")
+                context += _ATTRACTIONS_LINE.format(len(research_data['attractions']))
             if 'weather' in research_data:
-                context_parts.append(f"- Weather: {research_data['weather'].get('current', {}).get('description', 'Unknown')}")
+                context += _WEATHER_LINE.format(research_data['weather'].get('current', {}).get('description', 'Unknown'))
         
-        return "\n".join(context_parts)
+        return context
     
-    def _create_itinerary_prompt(self, trip_request: Dict[str, Any], research_data: Dict[str, Any], context: str) -> str:
+    def _create_itinerary_prompt(self, trip: NormalizedTripRequest, research_data: Dict[str, Any], context: str) -> str:
         """Create a detailed prompt for LLM itinerary generation"""
         return f"""
         You are an expert travel planner. Create a detailed, day-by-day itinerary based on the following information:
@@ -249,108 +593,69 @@ class ImprovedPlannerAgent(BaseAgent):
         {context}
         
         Research Data Available:
-        {json.dumps(research_data, indent=2)}
+        {_research_json(research_data)}
         
-        Please create a comprehensive itinerary that includes:
-        1. Daily schedules with specific times
-        2. Activities and attractions for each day
-        3. Meal recommendations
-        4. Transportation between locations
-        5. Estimated costs for each activity
-        6. Time buffers for travel and rest
-        7. Alternative options for each day
-        8. Special considerations (weather, local customs, etc.)
-        
-        Format the response as a structured JSON with the following structure:
-        {{
-            "itinerary": {{
-                "overview": {{
-                    "destination": "string",
-                    "duration": "number",
-                    "total_estimated_cost": "number",
-                    "difficulty_level": "string",
-                    "best_time_to_visit": "string"
-                }},
-                "days": [
-                    {{
-                        "day": "number",
-                        "date": "string",
-                        "theme": "string",
-                        "activities": [
-                            {{
-                                "time": "string",
-                                "activity": "string",
-                                "location": "string",
-                                "duration": "string",
-                                "cost": "number",
-                                "description": "string",
-                                "tips": "string"
-                            }}
-                        ],
-                        "meals": [
-                            {{
-                                "time": "string",
-                                "type": "string",
-                                "restaurant": "string",
-                                "cuisine": "string",
-                                "cost": "number",
-                                "reservation_required": "boolean"
-                            }}
-                        ],
-                        "transportation": [
-                            {{
-                                "from": "string",
-                                "to": "string",
-                                "method": "string",
-                                "duration": "string",
-                                "cost": "number",
-                                "tips": "string"
-                            }}
-                        ],
-                        "daily_budget": "number",
-                        "daily_tips": "string"
-                    }}
-                ]
-            }}
-        }}
-        
-        Make the itinerary practical, enjoyable, and within budget. Include specific recommendations and insider tips.
-        """
+""" + _ITINERARY_INSTRUCTIONS
     
-    def _parse_itinerary_response(self, llm_response: str, trip_request: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_itinerary_response(self, llm_response: str, trip: NormalizedTripRequest, now_iso: str) -> Dict[str, Any]:
         """Parse and validate LLM response"""
         try:
-            # Try to extract JSON from response
-            if "```json" in llm_response:
-                json_start = llm_response.find("```json") + 7
-                json_end = llm_response.find("```", json_start)
-                json_str = llm_response[json_start:json_end].strip()
-            elif "{" in llm_response and "}" in llm_response:
-                json_start = llm_response.find("{")
-                json_end = llm_response.rfind("}") + 1
-                json_str = llm_response[json_start:json_end]
-            else:
-                # Fallback: create structured response from text
-                return self._create_structured_itinerary_from_text(llm_response, trip_request)
+            json_str = llm_response.strip()
+            if not json_str.startswith("{"):
+                # Not schema-constrained output; extract a ```json fence, else
+                # the outermost {...}, in one scan
+                match = _JSON_BLOCK_RE.match(llm_response)
+                if match is None:
+                    # Fallback: create structured response from text
+                    return self._create_structured_itinerary_from_text(llm_response, trip)
+                json_str = match.group(1) if match.group(1) is not None else match.group(2)
             
-            itinerary = json.loads(json_str)
-            return self._validate_and_enhance_itinerary(itinerary, trip_request)
+            itinerary = loads_json(json_str)
+            return self._validate_and_enhance_itinerary(itinerary, trip, now_iso)
             
         except json.JSONDecodeError as e:
-            print(f"Error parsing LLM response: {e}")
-            return self._create_structured_itinerary_from_text(llm_response, trip_request)
+            logger.warning("Error parsing LLM response: %s", e)
+            return self._create_structured_itinerary_from_text(llm_response, trip)
     
-    def _create_structured_itinerary_from_text(self, text: str, trip_request: Dict[str, Any]) -> Dict[str, Any]:
-        """Create structured itinerary from text response"""
-        destination = trip_request.get('destination', 'Unknown')
-        duration = trip_request.get('duration', 3)
+    def _create_structured_itinerary_from_text(self, text: str, trip: NormalizedTripRequest) -> Dict[str, Any]:
+        """Create structured itinerary from text response
+        
+        Every day gets the same placeholder schedule, so the activity and
+        meal templates (and the per-day strings) are built once. Each day
+        gets its own copies, since callers and the orchestrator's result
+        cache may hand the itinerary out and mutate single days.
+        """
+        destination = trip.destination
+        duration = trip.duration
+        budget = trip.budget
+        
+        activity = {
+            "time": "09:00",
+            "activity": f"Morning activity in {destination}",
+            "location": destination,
+            "duration": "2 hours",
+            "cost": 50,
+            "description": "Explore local attractions",
+            "tips": "Arrive early to avoid crowds"
+        }
+        meal = {
+            "time": "12:00",
+            "type": "lunch",
+            "restaurant": f"Local restaurant in {destination}",
+            "cuisine": "local",
+            "cost": 25,
+            "reservation_required": False
+        }
+        theme = f"Explore {destination}"
+        daily_budget = budget / duration
+        daily_tips = f"Enjoy your time in {destination}"
         
         return {
             "itinerary": {
                 "overview": {
                     "destination": destination,
                     "duration": duration,
-                    "total_estimated_cost": trip_request.get('budget', 1000),
+                    "total_estimated_cost": budget,
                     "difficulty_level": "moderate",
                     "best_time_to_visit": "year-round"
                 },
@@ -358,195 +663,47 @@ class ImprovedPlannerAgent(BaseAgent):
                     {
                         "day": i + 1,
                         "date": f"Day {i + 1}",
-                        "theme": f"Explore {destination}",
-                        "activities": [
-                            {
-                                "time": "09:00",
-                                "activity": f"Morning activity in {destination}",
-                                "location": destination,
-                                "duration": "2 hours",
-                                "cost": 50,
-                                "description": "Explore local attractions",
-                                "tips": "Arrive early to avoid crowds"
-                            }
-                        ],
-                        "meals": [
-                            {
-                                "time": "12:00",
-                                "type": "lunch",
-                                "restaurant": f"Local restaurant in {destination}",
-                                "cuisine": "local",
-                                "cost": 25,
-                                "reservation_required": False
-                            }
-                        ],
+                        "theme": theme,
+                        "activities": [dict(activity)],
+                        "meals": [dict(meal)],
                         "transportation": [],
-                        "daily_budget": trip_request.get('budget', 1000) / duration,
-                        "daily_tips": f"Enjoy your time in {destination}"
+                        "daily_budget": daily_budget,
+                        "daily_tips": daily_tips
                     } for i in range(duration)
                 ]
             }
         }
     
-    def _validate_and_enhance_itinerary(self, itinerary: Dict[str, Any], trip_request: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_and_enhance_itinerary(self, itinerary: Dict[str, Any], trip: NormalizedTripRequest, now_iso: str) -> Dict[str, Any]:
         """Validate and enhance the parsed itinerary"""
         # Ensure required fields exist
-        if "itinerary" not in itinerary:
-            itinerary["itinerary"] = {}
-        
-        if "overview" not in itinerary["itinerary"]:
-            itinerary["itinerary"]["overview"] = {}
-        
-        if "days" not in itinerary["itinerary"]:
-            itinerary["itinerary"]["days"] = []
+        body = itinerary.setdefault("itinerary", {})
+        body.setdefault("overview", {})
+        body.setdefault("days", [])
         
         # Add metadata
         itinerary["metadata"] = {
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": now_iso,
             "agent": self.name,
-            "trip_request_id": trip_request.get("trip_id"),
+            "trip_request_id": trip.trip_id,
             "version": "1.0"
         }
         
         return itinerary
     
-    async def _enhance_itinerary(self, itinerary: Dict[str, Any], trip_request: Dict[str, Any], research_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Enhance itinerary with additional planning features"""
-        # Add practical enhancements
-        itinerary["enhancements"] = {
-            "packing_list": self._generate_packing_list(trip_request),
-            "emergency_contacts": self._get_emergency_contacts(trip_request.get('destination', '')),
-            "local_customs": self._get_local_customs_tips(trip_request.get('destination', '')),
-            "weather_preparation": self._get_weather_preparation(trip_request.get('destination', '')),
-            "safety_tips": self._get_safety_tips(trip_request.get('destination', ''))
-        }
-        
-        return itinerary
-    
-    def _generate_packing_list(self, trip_request: Dict[str, Any]) -> List[str]:
-        """Generate a packing list based on trip details"""
-        destination = trip_request.get('destination', '').lower()
-        duration = trip_request.get('duration', 3)
-        trip_type = trip_request.get('trip_type', 'leisure')
-        
-        base_items = [
-            "Passport/ID",
-            "Travel documents",
-            "Phone and charger",
-            "Camera",
-            "Clothes for the duration",
-            "Comfortable walking shoes",
-            "Toiletries",
-            "First aid kit"
-        ]
-        
-        # Add destination-specific items
-        if 'beach' in destination or 'coastal' in destination:
-            base_items.extend(["Sunscreen", "Swimsuit", "Beach towel", "Sunglasses"])
-        
-        if 'mountain' in destination or 'hiking' in trip_type:
-            base_items.extend(["Hiking boots", "Backpack", "Water bottle", "Layers"])
-        
-        if 'winter' in destination or 'cold' in destination:
-            base_items.extend(["Warm jacket", "Gloves", "Hat", "Thermal layers"])
-        
-        return base_items
-    
-    def _get_emergency_contacts(self, destination: str) -> Dict[str, str]:
-        """Get emergency contacts for destination"""
+    def _build_enhancements(self, trip: NormalizedTripRequest) -> Dict[str, Any]:
+        """Build the practical enhancements added to every generated itinerary"""
         return {
-            "emergency": "911",
-            "local_police": "Local emergency number",
-            "embassy": "Check embassy website",
-            "hospital": "Local hospital",
-            "tourist_helpline": "Local tourist information"
+            "packing_list": self._generate_packing_list(trip),
+            "emergency_contacts": dict(_EMERGENCY_CONTACTS),
+            "local_customs": list(_LOCAL_CUSTOMS_TIPS),
+            "weather_preparation": list(_WEATHER_PREPARATION),
+            "safety_tips": list(_SAFETY_TIPS)
         }
     
-    def _get_local_customs_tips(self, destination: str) -> List[str]:
-        """Get local customs and etiquette tips"""
-        return [
-            "Research local customs before traveling",
-            "Learn basic phrases in the local language",
-            "Respect local dress codes",
-            "Be aware of tipping customs",
-            "Follow local dining etiquette"
-        ]
-    
-    def _get_weather_preparation(self, destination: str) -> List[str]:
-        """Get weather preparation tips"""
-        return [
-            "Check weather forecast before departure",
-            "Pack appropriate clothing layers",
-            "Bring weather protection (umbrella, raincoat)",
-            "Consider seasonal variations",
-            "Plan indoor alternatives for bad weather"
-        ]
-    
-    def _get_safety_tips(self, destination: str) -> List[str]:
-        """Get safety tips for destination"""
-        return [
-            "Keep copies of important documents",
-            "Stay aware of your surroundings",
-            "Use hotel safes for valuables",
-            "Keep emergency contacts handy",
-            "Follow local safety guidelines"
-        ]
-    
-    def _get_accommodation_recommendations(self, budget: float, destination: str) -> List[str]:
-        """Get accommodation recommendations based on budget"""
-        if budget > 2000:
-            return ["Luxury hotels", "Boutique properties", "5-star resorts"]
-        elif budget > 1000:
-            return ["Mid-range hotels", "Business hotels", "Boutique B&Bs"]
-        else:
-            return ["Hostels", "Budget hotels", "Airbnb", "Guesthouses"]
-    
-    def _get_food_recommendations(self, budget: float, destination: str) -> List[str]:
-        """Get food recommendations based on budget"""
-        if budget > 2000:
-            return ["Fine dining restaurants", "Michelin-starred venues", "Private dining"]
-        elif budget > 1000:
-            return ["Mid-range restaurants", "Local favorites", "Food tours"]
-        else:
-            return ["Street food", "Local markets", "Budget-friendly cafes", "Self-catering"]
-    
-    def _get_activity_recommendations(self, budget: float, destination: str) -> List[str]:
-        """Get activity recommendations based on budget"""
-        if budget > 2000:
-            return ["Private tours", "Exclusive experiences", "VIP access"]
-        elif budget > 1000:
-            return ["Group tours", "Museum visits", "Cultural experiences"]
-        else:
-            return ["Free walking tours", "Public parks", "Free museums", "Self-guided exploration"]
-    
-    def _get_transportation_recommendations(self, budget: float, destination: str) -> List[str]:
-        """Get transportation recommendations based on budget"""
-        if budget > 2000:
-            return ["Private transfers", "First-class train", "Car rental with driver"]
-        elif budget > 1000:
-            return ["Taxis", "Ride-sharing", "Car rental"]
-        else:
-            return ["Public transportation", "Walking", "Bicycle rental", "Shared rides"]
-    
-    def _get_money_saving_tips(self, budget: float, destination: str) -> List[str]:
-        """Get money-saving tips"""
-        return [
-            "Book accommodations in advance",
-            "Use public transportation",
-            "Eat at local restaurants",
-            "Look for free activities",
-            "Travel during off-peak seasons"
-        ]
-    
-    def _get_splurge_opportunities(self, budget: float, destination: str) -> List[str]:
-        """Get splurge opportunities"""
-        return [
-            "Special dining experiences",
-            "Unique local activities",
-            "Premium accommodations",
-            "Private tours",
-            "Souvenirs and local crafts"
-        ]
+    def _generate_packing_list(self, trip: NormalizedTripRequest) -> List[str]:
+        """Generate a packing list based on trip details"""
+        return list(_packing_items(trip.destination, trip.trip_type))
     
     def _get_personalized_recommendations(self, preferences: Dict[str, Any], interests: List[str]) -> List[str]:
         """Get personalized recommendations based on preferences and interests"""
@@ -566,14 +723,14 @@ class ImprovedPlannerAgent(BaseAgent):
         
         return recommendations
     
-    def _create_fallback_itinerary(self, trip_request: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_fallback_itinerary(self, trip: NormalizedTripRequest) -> Dict[str, Any]:
         """Create a fallback itinerary when LLM fails"""
-        return self._create_structured_itinerary_from_text("Basic itinerary", trip_request)
+        return self._create_structured_itinerary_from_text("Basic itinerary", trip)
     
-    def _create_fallback_budget_plan(self, trip_request: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_fallback_budget_plan(self, trip: NormalizedTripRequest) -> Dict[str, Any]:
         """Create a fallback budget plan"""
-        budget = trip_request.get("budget", 1000)
-        duration = trip_request.get("duration", 3)
+        budget = trip.budget
+        duration = trip.duration
         
         return {
             "total_budget": budget,
@@ -587,69 +744,42 @@ class ImprovedPlannerAgent(BaseAgent):
             }
         }
     
-    def _calculate_planning_confidence(self, response_data: Dict[str, Any]) -> float:
-        """Calculate confidence score for the planning response"""
-        confidence_factors = []
-        
-        # Check if itinerary was generated
-        if "itinerary" in response_data:
-            confidence_factors.append(0.8)
-        
-        # Check data completeness
-        if "itinerary" in response_data and "days" in response_data["itinerary"]:
-            days = response_data["itinerary"]["days"]
-            if len(days) > 0:
-                confidence_factors.append(0.9)
-        
-        # Check for enhancements
+    def _summarize(self, response_data: Dict[str, Any]) -> Tuple[float, str]:
+        """Score confidence and grade quality of a planning response in one pass"""
+        itinerary = response_data.get("itinerary")
+        days = itinerary.get("days") if itinerary is not None else None
+        
+        # Average the confidence factors that apply, without collecting them
+        confidence_sum = 0.0
+        confidence_count = 0
+        if itinerary is not None:
+            confidence_sum += 0.8
+            confidence_count += 1
+        if days:
+            confidence_sum += 0.9
+            confidence_count += 1
         if "enhancements" in response_data:
-            confidence_factors.append(0.7)
-        
-        if confidence_factors:
-            return sum(confidence_factors) / len(confidence_factors)
-        
-        return 0.5
-    
-    def _assess_planning_quality(self, response_data: Dict[str, Any]) -> str:
-        """Assess the quality of the planning response"""
-        if "itinerary" not in response_data:
-            return "poor"
-        
-        itinerary = response_data["itinerary"]
-        if "days" not in itinerary or len(itinerary["days"]) == 0:
-            return "poor"
-        
-        # Check for detailed activities
-        total_activities = 0
-        for day in itinerary["days"]:
-            if "activities" in day:
-                total_activities += len(day["activities"])
+            confidence_sum += 0.7
+            confidence_count += 1
+        confidence = confidence_sum / confidence_count if confidence_count else 0.5
         
-        if total_activities > 10:
-            return "excellent"
-        elif total_activities > 5:
-            return "good"
+        if not days:
+            quality = "poor"
         else:
-            return "fair"
-    
-    def _get_used_capabilities(self, request: Dict[str, Any]) -> List[str]:
-        """Get list of capabilities used for this request"""
-        capabilities = []
-        query_type = request.get("type", "")
-        
-        if query_type in ["plan", "planning", "itinerary"]:
-            capabilities.extend(["itinerary_generation", "activity_scheduling", "time_management"])
-        
-        if query_type == "budget_plan":
-            capabilities.extend(["budget_optimization", "accommodation_planning", "meal_planning"])
-        
-        if query_type == "optimize":
-            capabilities.extend(["route_optimization", "time_management"])
-        
-        if query_type == "customize":
-            capabilities.extend(["activity_scheduling", "meal_planning", "transportation_planning"])
+            # Check for detailed activities
+            total_activities = sum(len(day["activities"]) for day in days if "activities" in day)
+            if total_activities > 10:
+                quality = "excellent"
+            elif total_activities > 5:
+                quality = "good"
+            else:
+                quality = "fair"
         
-        return capabilities
+        return confidence, quality
+    
+    def _get_used_capabilities(self, request: Dict[str, Any]) -> Tuple[str, ...]:
+        """Get the capabilities used for this request (shared, immutable)"""
+        return self._CAPS_BY_TYPE.get(request.get("type", ""), ())
 
 # Create the improved planner agent instance
 improved_planner_agent = ImprovedPlannerAgent()
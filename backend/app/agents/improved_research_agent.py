@@ -9,11 +9,51 @@ This agent provides real research capabilities using:
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import logging
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
 from .base_agent import BaseAgent, AgentResponse, AgentMessage
+from .event_emitter import emit_agent_event
 from .rag_system import rag_system
 from .real_apis import google_places, weather_api
+from .ttl_cache import TTLCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+# Result cache lifetimes (seconds): weather goes stale within the hour,
+# attraction listings barely change from one day to the next.
+WEATHER_TTL = 600
+ATTRACTIONS_TTL = 24 * 3600
+
+_weather_cache = TTLCache(ttl=WEATHER_TTL)
+_attractions_cache = TTLCache(ttl=ATTRACTIONS_TTL)
+
+# Section name for knowledge base results, which merge into the response
+_KNOWLEDGE_BASE = "knowledge_base"
+# Agent stream message announcing each section as its lookup lands
+_SECTION_MESSAGES = {
+    _KNOWLEDGE_BASE: "Knowledge base results ready",
+    "attractions": "Attractions found",
+    "weather": "Weather information ready",
+    "local_insights": "Local insights ready",
+}
+# Real-time section fetched when a request of that type names a destination
+_DESTINATION_SECTIONS = {
+    "attractions": ("attractions",),
+    "weather": ("weather",),
+    "local_insights": ("local_insights",),
+}
+# Query types answered from the knowledge base
+_RAG_QUERY_TYPES = frozenset({"research", "destination_info", "recommendations"})
+# Short lookups for live facts gain nothing from retrieval over travel guides
+_REALTIME_KEYWORDS = (
+    "weather", "forecast", "temperature", "open now", "opening hours", "phone number"
+)
+_RAG_SKIP_MAX_WORDS = 8
+
+# Sections that count towards a response's completeness score
+_DATA_FIELDS = ("attractions", "weather", "local_insights", "knowledge_response")
 
 class ImprovedResearchAgent(BaseAgent):
     """Enhanced research agent with real API integrations"""
@@ -44,38 +84,34 @@ class ImprovedResearchAgent(BaseAgent):
     
     async def process_request(self, request: Dict[str, Any]) -> AgentResponse:
         """Process a research request with real data"""
+        now_iso = datetime.now(timezone.utc).isoformat()
+        start_time = time.perf_counter()
         try:
-            query_type = request.get("type", "research")
-            user_query = request.get("query", "")
-            destination = request.get("destination", "")
-            context = request.get("context", {})
-            
-            # Initialize response data
-            response_data = {
-                "query_type": query_type,
-                "destination": destination,
-                "timestamp": datetime.utcnow().isoformat(),
-                "sources": [],
-                "confidence": 0.0
-            }
-            
-            # Use RAG system for knowledge base queries
-            if query_type in ["research", "destination_info", "recommendations"]:
-                rag_response = await self._query_rag_system(user_query, context)
-                response_data.update(rag_response)
+            response_data = self._new_response_data(request, now_iso)
             
-            # Get real-time data based on query type
-            if query_type == "attractions" and destination:
-                attractions = await self._get_attractions(destination, request)
-                response_data["attractions"] = attractions
+            session_id = request.get("context", {}).get("session_id")
             
-            if query_type == "weather" and destination:
-                weather = await self._get_weather(destination, request)
-                response_data["weather"] = weather
-            
-            if query_type == "local_insights" and destination:
-                insights = await self._get_local_insights(destination, request)
-                response_data["local_insights"] = insights
+            # Fan the independent lookups out concurrently and merge each one
+            # as it lands, announcing it on the session's agent stream
+            tasks = [
+                asyncio.ensure_future(self._run_lookup(section, lookup))
+                for section, lookup in self._plan_lookups(request, now_iso)
+            ]
+            try:
+                for next_lookup in asyncio.as_completed(tasks):
+                    section, result = await next_lookup
+                    if self._merge_lookup(response_data, section, result) and session_id:
+                        await emit_agent_event(session_id, {
+                            "agent_type": "research",
+                            "agent_name": "Research Agent",
+                            "event_type": "result",
+                            "message": _SECTION_MESSAGES[section],
+                            "data": {section: result}
+                        })
+            finally:
+                # Stop lookups nobody waits for if this request is cancelled
+                for task in tasks:
+                    task.cancel()
             
             # Calculate overall confidence
             response_data["confidence"] = self._calculate_confidence(response_data)
@@ -85,7 +121,7 @@ class ImprovedResearchAgent(BaseAgent):
                 data=response_data,
                 metadata={
                     "agent": self.name,
-                    "processing_time": datetime.utcnow().isoformat(),
+                    "processing_time": time.perf_counter() - start_time,
                     "capabilities_used": self._get_used_capabilities(request)
                 }
             )
@@ -97,17 +133,81 @@ class ImprovedResearchAgent(BaseAgent):
                 metadata={"agent": self.name}
             )
     
+    def _new_response_data(self, request: Dict[str, Any], now_iso: str) -> Dict[str, Any]:
+        """Skeleton research response that lookups are merged into"""
+        return {
+            "query_type": request.get("type", "research"),
+            "destination": request.get("destination", ""),
+            "timestamp": now_iso,
+            "sources": [],
+            "confidence": 0.0
+        }
+    
+    def _plan_lookups(self, request: Dict[str, Any], now_iso: str) -> List[Tuple[str, Awaitable[Any]]]:
+        """Pair each independent lookup a request needs with its section"""
+        query_type = request.get("type", "research")
+        user_query = request.get("query", "")
+        destination = request.get("destination", "")
+        
+        lookups = []
+        if self._should_use_rag(user_query, query_type):
+            lookups.append((_KNOWLEDGE_BASE, self._query_rag_system(user_query, request.get("context", {}))))
+        
+        if destination:
+            for section in _DESTINATION_SECTIONS.get(query_type, ()):
+                if section == "attractions":
+                    lookups.append((section, self._get_attractions(destination, request)))
+                elif section == "weather":
+                    lookups.append((section, self._get_weather(destination, request, now_iso)))
+                elif section == "local_insights":
+                    lookups.append((section, self._get_local_insights(destination, request)))
+        
+        return lookups
+    
+    @staticmethod
+    async def _run_lookup(section: str, lookup: Awaitable[Any]) -> Tuple[str, Any]:
+        """Await a lookup, returning its section with the result or exception"""
+        try:
+            return section, await lookup
+        except Exception as e:
+            return section, e
+    
+    def _merge_lookup(self, response_data: Dict[str, Any], section: str, result: Any) -> bool:
+        """Merge a lookup result into the response; False if the lookup failed"""
+        if isinstance(result, Exception):
+            logger.error("Error researching %s", section, exc_info=result)
+            return False
+        if section == _KNOWLEDGE_BASE:
+            # RAG results are merged field by field
+            response_data.update(result)
+        else:
+            response_data[section] = result
+        return True
+    
+    def _should_use_rag(self, query: str, query_type: str) -> bool:
+        """Decide whether a request needs a knowledge base lookup"""
+        if query_type not in _RAG_QUERY_TYPES:
+            return False
+        
+        # Short live-fact questions ("weather in Rome?") skip retrieval
+        query = query.lower()
+        if len(query.split()) <= _RAG_SKIP_MAX_WORDS and any(
+            keyword in query for keyword in _REALTIME_KEYWORDS
+        ):
+            return False
+        
+        return True
+    
     async def _query_rag_system(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Query the RAG system for knowledge base information"""
         try:
-            async with rag_system as rag:
-                result = await rag.query(query, context)
-                return {
-                    "knowledge_response": result.get("response", ""),
-                    "sources": result.get("sources", []),
-                    "rag_confidence": result.get("confidence", 0.0),
-                    "real_time_data": result.get("real_time_data", False)
-                }
+            result = await rag_system.query(query, context)
+            return {
+                "knowledge_response": result.get("response", ""),
+                "sources": result.get("sources", []),
+                "rag_confidence": result.get("confidence", 0.0),
+                "real_time_data": result.get("real_time_data", False)
+            }
         except Exception as e:
             return {
                 "knowledge_response": f"Unable to access knowledge base: {str(e)}",
@@ -117,62 +217,88 @@ class ImprovedResearchAgent(BaseAgent):
             }
     
     async def _get_attractions(self, destination: str, request: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Get attractions using Google Places API"""
-        try:
-            if not google_places:
-                return self._get_mock_attractions(destination)
-            
-            async with google_places as places:
-                # Search for tourist attractions
-                attractions = await places.search_places(
-                    query=f"tourist attractions in {destination}",
-                    place_type="tourist_attraction"
-                )
-                
-                # Get detailed information for top attractions
-                detailed_attractions = []
-                for attraction in attractions[:5]:  # Limit to top 5
-                    details = await places.get_place_details(attraction.place_id)
-                    if details:
-                        detailed_attractions.append({
-                            "name": details.name,
-                            "rating": details.rating,
-                            "address": details.address,
-                            "types": details.types,
-                            "price_level": details.price_level,
-                            "phone": details.phone_number,
-                            "website": details.website,
-                            "photos": details.photos[:3]  # Limit photos
-                        })
-                
-                return detailed_attractions
+        """Get attractions, serving repeated destinations from the TTL cache"""
+        if not google_places:
+            return self._get_mock_attractions(destination)
         
-        except Exception as e:
-            print(f"Error getting attractions: {e}")
+        key = cache_key("attractions", destination=destination)
+        cached = _attractions_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            attractions = await self._fetch_attractions(destination)
+        except Exception:
+            logger.exception("Error getting attractions")
+            # Fall back to mock results, leaving the failure uncached
             return self._get_mock_attractions(destination)
+        
+        _attractions_cache.set(key, attractions)
+        return attractions
     
-    async def _get_weather(self, destination: str, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Get weather information"""
+    async def _fetch_attractions(self, destination: str) -> List[Dict[str, Any]]:
+        """Get attractions using Google Places API"""
+        # Search for tourist attractions
+        attractions = await google_places.search_places(
+            query=f"tourist attractions in {destination}",
+            place_type="tourist_attraction"
+        )
+        
+        # Get detailed information for the top 5 attractions concurrently
+        details_list = await asyncio.gather(
+            *(google_places.get_place_details(attraction.place_id) for attraction in attractions[:5]),
+            return_exceptions=True
+        )
+        
+        detailed_attractions = []
+        for details in details_list:
+            if details and not isinstance(details, Exception):
+                detailed_attractions.append({
+                    "name": details.name,
+                    "rating": details.rating,
+                    "address": details.address,
+                    "types": details.types,
+                    "price_level": details.price_level,
+                    "phone": details.phone_number,
+                    "website": details.website,
+                    "photos": details.photos[:3]  # Limit photos
+                })
+        
+        return detailed_attractions
+    
+    async def _get_weather(self, destination: str, request: Dict[str, Any], now_iso: str) -> Dict[str, Any]:
+        """Get weather information, serving repeated destinations from the TTL cache"""
+        if not weather_api:
+            return self._get_mock_weather(destination, now_iso)
+        
+        key = cache_key("weather", destination=destination)
+        cached = _weather_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            if not weather_api:
-                return self._get_mock_weather(destination)
-            
-            async with weather_api as weather:
-                # Get current weather
-                current = await weather.get_current_weather(destination)
-                
-                # Get 5-day forecast
-                forecast = await weather.get_forecast(destination, days=5)
-                
-                return {
-                    "current": self._parse_weather_data(current),
-                    "forecast": self._parse_forecast_data(forecast),
-                    "last_updated": datetime.utcnow().isoformat()
-                }
+            weather = await self._fetch_weather(destination, now_iso)
+        except Exception:
+            logger.exception("Error getting weather")
+            # Fall back to mock results, leaving the failure uncached
+            return self._get_mock_weather(destination, now_iso)
         
-        except Exception as e:
-            print(f"Error getting weather: {e}")
-            return self._get_mock_weather(destination)
+        _weather_cache.set(key, weather)
+        return weather
+    
+    async def _fetch_weather(self, destination: str, now_iso: str) -> Dict[str, Any]:
+        """Get current weather and forecast from the weather API"""
+        # Get current weather
+        current = await weather_api.get_current_weather(destination)
+        
+        # Get 5-day forecast
+        forecast = await weather_api.get_forecast(destination, days=5)
+        
+        return {
+            "current": self._parse_weather_data(current),
+            "forecast": self._parse_forecast_data(forecast),
+            "last_updated": now_iso
+        }
     
     async def _get_local_insights(self, destination: str, request: Dict[str, Any]) -> Dict[str, Any]:
         """Get local insights and recommendations"""
@@ -221,7 +347,7 @@ class ImprovedResearchAgent(BaseAgent):
             }
         ]
     
-    def _get_mock_weather(self, destination: str) -> Dict[str, Any]:
+    def _get_mock_weather(self, destination: str, now_iso: str) -> Dict[str, Any]:
         """Fallback mock weather data"""
         return {
             "current": {
@@ -235,7 +361,7 @@ class ImprovedResearchAgent(BaseAgent):
                 {"day": "Tomorrow", "high": 23, "low": 16, "description": "Cloudy"},
                 {"day": "Day 3", "high": 20, "low": 14, "description": "Rainy"}
             ],
-            "last_updated": datetime.utcnow().isoformat()
+            "last_updated": now_iso
         }
     
     def _parse_weather_data(self, weather_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -275,27 +401,29 @@ class ImprovedResearchAgent(BaseAgent):
     
     def _calculate_confidence(self, response_data: Dict[str, Any]) -> float:
         """Calculate confidence score for the response"""
-        confidence_factors = []
+        # Average the confidence factors that apply, without collecting them
+        confidence_sum = 0.0
+        confidence_count = 0
         
         # RAG confidence
         if "rag_confidence" in response_data:
-            confidence_factors.append(response_data["rag_confidence"])
+            confidence_sum += response_data["rag_confidence"]
+            confidence_count += 1
         
         # Real-time data availability
         if response_data.get("real_time_data", False):
-            confidence_factors.append(0.9)
+            confidence_sum += 0.9
+            confidence_count += 1
         
         # Data completeness
-        data_fields = ["attractions", "weather", "local_insights", "knowledge_response"]
-        available_fields = sum(1 for field in data_fields if field in response_data and response_data[field])
-        completeness_score = available_fields / len(data_fields)
-        confidence_factors.append(completeness_score)
-        
-        # Calculate average confidence
-        if confidence_factors:
-            return sum(confidence_factors) / len(confidence_factors)
+        available_fields = 0
+        for field in _DATA_FIELDS:
+            if response_data.get(field):
+                available_fields += 1
+        confidence_sum += available_fields / len(_DATA_FIELDS)
+        confidence_count += 1
         
-        return 0.5
+        return confidence_sum / confidence_count if confidence_count else 0.5
     
     def _get_used_capabilities(self, request: Dict[str, Any]) -> List[str]:
         """Get list of capabilities used for this request"""
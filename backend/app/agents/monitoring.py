@@ -14,8 +14,9 @@ import asyncio
 import time
 import psutil
 import logging
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Deque, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import json
@@ -25,6 +26,10 @@ from app.agents.sessions import memory_manager
 
 logger = logging.getLogger(__name__)
 
+# Most recent metrics kept in memory; the oldest are dropped first, since the
+# 24-hour pruning only runs while resource monitoring is started
+MAX_METRICS = 10000
+
 class MetricType(Enum):
     PERFORMANCE = "performance"
     RESOURCE = "resource"
@@ -82,7 +87,7 @@ class AgentMonitor:
     """Main monitoring class for AI agents"""
     
     def __init__(self):
-        self.metrics: List[AgentMetric] = []
+        self.metrics: Deque[AgentMetric] = deque(maxlen=MAX_METRICS)
         self.performance_data: Dict[str, AgentPerformance] = {}
         self.error_events: List[ErrorEvent] = []
         self.resource_usage: List[ResourceUsage] = []
@@ -126,7 +131,7 @@ class AgentMonitor:
                 
                 # Clean up old metrics (keep last 24 hours)
                 cutoff_time = datetime.now() - timedelta(hours=24)
-                self.metrics = [m for m in self.metrics if m.timestamp > cutoff_time]
+                self.metrics = deque((m for m in self.metrics if m.timestamp > cutoff_time), maxlen=MAX_METRICS)
                 self.error_events = [e for e in self.error_events if e.timestamp > cutoff_time]
                 
                 await asyncio.sleep(60)  # Monitor every minute
@@ -12,7 +12,8 @@ from .event_emitter import emit_agent_event
 
 # Import improved agents
 try:
-    from .improved_orchestrator import improved_orchestrator
+    from .improved_orchestrator import get_orchestrator
+    improved_orchestrator = get_orchestrator()
     from .improved_research_agent import improved_research_agent
     from .improved_planner_agent import improved_planner_agent
     from .improved_booker_agent import improved_booker_agent
@@ -183,39 +184,6 @@ async def plan_trip_with_agents(user_id: str, session_id: str, trip_request: dic
             print(f"🔍 Response type: {type(response)}")
             print(f"🔍 Response keys: {response.keys() if isinstance(response, dict) else 'Not a dict'}")
             
-            # Emit completion events for each phase
-            if response and isinstance(response, dict):
-                detailed_results = response.get("detailed_results", {})
-                
-                # Research complete
-                if "research" in detailed_results:
-                    await emit_agent_event(session_id, {
-                        "agent_type": "research",
-                        "agent_name": "Research Agent",
-                        "event_type": "complete",
-                        "message": "Research completed - Found destination information and recommendations",
-                        "confidence": detailed_results["research"].get("confidence", 0.5)
-                    })
-                
-                # Planning complete
-                if "planning" in detailed_results:
-                    await emit_agent_event(session_id, {
-                        "agent_type": "planner",
-                        "agent_name": "Planning Agent",
-                        "event_type": "complete",
-                        "message": "Itinerary created with daily activities, meals, and transportation",
-                        "confidence": detailed_results["planning"].get("confidence", 0.8)
-                    })
-                
-                # Booking complete
-                if "booking" in detailed_results:
-                    await emit_agent_event(session_id, {
-                        "agent_type": "booker",
-                        "agent_name": "Booking Agent",
-                        "event_type": "complete",
-                        "message": "Booking options identified with pricing and availability",
-                        "confidence": detailed_results["booking"].get("confidence", 0.9)
-                    })
         else:
             print("❌ Improved orchestrator is None!")
             await emit_agent_event(session_id, {
@@ -14,12 +14,12 @@ import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import asyncio
-import aiohttp
 from dataclasses import dataclass
 # from sentence_transformers import SentenceTransformer  # Commented out due to dependency issues
 import faiss
 from app.core.config import settings
-from app.core.llm import call_llm
+from app.core.llm import call_llm_async
+from .real_apis import get_shared_session
 
 @dataclass
 class KnowledgeItem:
@@ -214,16 +214,23 @@ class RealRAGSystem:
         self.knowledge_base = TravelKnowledgeBase()
         self.session = None
     
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+    async def connect(self):
+        """Bind to the shared HTTP session"""
+        if self.session is None or self.session.closed:
+            self.session = get_shared_session()
         return self
     
+    async def __aenter__(self):
+        return await self.connect()
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The session is shared; it is closed by close_shared_session()
+        pass
     
     async def query(self, user_query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Query the RAG system with real data integration"""
+        await self.connect()
+        
         try:
             # Get relevant context from knowledge base
             kb_context = self.knowledge_base.get_context_for_query(user_query)
@@ -249,7 +256,7 @@ class RealRAGSystem:
             If the context doesn't contain enough information, mention that you're providing general advice and suggest consulting official sources.
             """
             
-            response = await call_llm(prompt)
+            response = await call_llm_async(prompt)
             
             return {
                 "response": response,
@@ -12,11 +12,50 @@ This module provides production-ready integrations with external APIs:
 import asyncio
 import aiohttp
 import json
+import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from app.core.config import settings
 
+# Connection pool shared by every API client so hot booking and research
+# paths reuse keep-alive connections instead of re-handshaking per call.
+_SHARED_CONNECTOR_LIMIT = 300
+_SHARED_CONNECTOR_LIMIT_PER_HOST = 75
+
+# Per-request timeouts, sized for each endpoint (the shared session keeps
+# aiohttp's default). Flight-offer searches are routinely slow.
+_AMADEUS_AUTH_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+_AMADEUS_SEARCH_TIMEOUT = aiohttp.ClientTimeout(total=45, connect=5)
+_AMADEUS_STATUS_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+_STRIPE_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5)
+_PLACES_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+_WEATHER_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+
+# Refresh Amadeus tokens this many seconds before they expire
+_TOKEN_EXPIRY_MARGIN = 60
+
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """Return the process-wide HTTP session, creating it on first use"""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=_SHARED_CONNECTOR_LIMIT,
+                limit_per_host=_SHARED_CONNECTOR_LIMIT_PER_HOST
+            )
+        )
+    return _shared_session
+
+async def close_shared_session():
+    """Close the shared HTTP session (called from the app shutdown hook)"""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
 @dataclass
 class Place:
     """Represents a place from Google Places API"""
@@ -68,13 +107,18 @@ class GooglePlacesAPI:
         self.base_url = "https://maps.googleapis.com/maps/api/place"
         self.session = None
     
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+    async def connect(self):
+        """Bind to the shared session"""
+        if self.session is None or self.session.closed:
+            self.session = get_shared_session()
         return self
     
+    async def __aenter__(self):
+        return await self.connect()
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The session is shared; it is closed by close_shared_session()
+        pass
     
     async def search_places(self, 
                            query: str, 
@@ -82,8 +126,7 @@ class GooglePlacesAPI:
                            radius: int = 50000,
                            place_type: str = "tourist_attraction") -> List[Place]:
         """Search for places using Google Places API"""
-        if not self.session:
-            raise RuntimeError("API client not initialized. Use async context manager.")
+        await self.connect()
         
         try:
             # Text search
@@ -98,7 +141,7 @@ class GooglePlacesAPI:
                 params["location"] = f"{location['lat']},{location['lng']}"
                 params["radius"] = radius
             
-            async with self.session.get(url, params=params) as response:
+            async with self.session.get(url, params=params, timeout=_PLACES_TIMEOUT) as response:
                 if response.status == 200:
                     data = await response.json()
                     return self._parse_places(data.get("results", []))
@@ -112,8 +155,7 @@ class GooglePlacesAPI:
     
     async def get_place_details(self, place_id: str) -> Optional[Place]:
         """Get detailed information about a specific place"""
-        if not self.session:
-            raise RuntimeError("API client not initialized. Use async context manager.")
+        await self.connect()
         
         try:
             url = f"{self.base_url}/details/json"
@@ -123,7 +165,7 @@ class GooglePlacesAPI:
                 "fields": "name,rating,price_level,types,geometry,formatted_address,formatted_phone_number,website,photos"
             }
             
-            async with self.session.get(url, params=params) as response:
+            async with self.session.get(url, params=params, timeout=_PLACES_TIMEOUT) as response:
                 if response.status == 200:
                     data = await response.json()
                     result = data.get("result")
@@ -180,39 +222,59 @@ class AmadeusAPI:
         self.client_secret = client_secret
         self.base_url = "https://test.api.amadeus.com"
         self.access_token = None
+        self.token_expires_at = 0.0
         self.session = None
+        # Serializes token refreshes so concurrent callers share one request
+        self._auth_lock = asyncio.Lock()
     
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
-        await self._authenticate()
+    async def connect(self):
+        """Bind to the shared session and (re-)authenticate if the token expired"""
+        if self.session is None or self.session.closed:
+            self.session = get_shared_session()
+        if not self.access_token or time.monotonic() >= self.token_expires_at:
+            await self._authenticate()
         return self
     
+    async def __aenter__(self):
+        return await self.connect()
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The session is shared; it is closed by close_shared_session()
+        pass
     
-    async def _authenticate(self):
-        """Authenticate with Amadeus API"""
+    async def _authenticate(self, rejected_token: Optional[str] = None):
+        """Authenticate with Amadeus API, keeping the current token until a new one arrives"""
         if not self.session:
             raise RuntimeError("API client not initialized. Use async context manager.")
         
-        try:
-            url = f"{self.base_url}/v1/security/oauth2/token"
-            data = {
-                "grant_type": "client_credentials",
-                "client_id": self.client_id,
-                "client_secret": self.client_secret
-            }
+        async with self._auth_lock:
+            # Another caller may have refreshed the token while this one waited
+            if (self.access_token and self.access_token != rejected_token
+                    and time.monotonic() < self.token_expires_at):
+                return
+            try:
+                url = f"{self.base_url}/v1/security/oauth2/token"
+                data = {
+                    "grant_type": "client_credentials",
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret
+                }
+                
+                async with self.session.post(url, data=data, timeout=_AMADEUS_AUTH_TIMEOUT) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        token = result.get("access_token")
+                        if token:
+                            expires_in = result.get("expires_in", 0)
+                            self.access_token = token
+                            self.token_expires_at = time.monotonic() + max(expires_in - _TOKEN_EXPIRY_MARGIN, 0)
+                        else:
+                            print("Amadeus authentication returned no access token")
+                    else:
+                        print(f"Amadeus authentication failed: {response.status}")
             
-            async with self.session.post(url, data=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    self.access_token = result.get("access_token")
-                else:
-                    print(f"Amadeus authentication failed: {response.status}")
-        
-        except Exception as e:
-            print(f"Error authenticating with Amadeus: {e}")
+            except Exception as e:
+                print(f"Error authenticating with Amadeus: {e}")
     
     async def search_flights(self, 
                            origin: str, 
@@ -223,8 +285,10 @@ class AmadeusAPI:
                            children: int = 0,
                            infants: int = 0) -> List[Flight]:
         """Search for flights using Amadeus API"""
-        if not self.session or not self.access_token:
-            raise RuntimeError("API client not authenticated. Use async context manager.")
+        await self.connect()
+        if not self.access_token:
+            print("Amadeus flight search skipped: not authenticated")
+            return []
         
         try:
             url = f"{self.base_url}/v2/shopping/flight-offers"
@@ -240,20 +304,55 @@ class AmadeusAPI:
             if return_date:
                 params["returnDate"] = return_date
             
-            headers = {"Authorization": f"Bearer {self.access_token}"}
-            
-            async with self.session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._parse_flights(data.get("data", []))
-                else:
-                    print(f"Amadeus flight search error: {response.status}")
-                    return []
+            status, data = await self._authorized_get(url, _AMADEUS_SEARCH_TIMEOUT, params)
+            if status == 200:
+                return self._parse_flights(data.get("data", []))
+            print(f"Amadeus flight search error: {status}")
+            return []
         
         except Exception as e:
             print(f"Error searching flights: {e}")
             return []
     
+    async def get_booking_status(self, booking_id: str) -> Optional[str]:
+        """Get the status of a flight order, or None if it cannot be read"""
+        await self.connect()
+        if not self.access_token:
+            return None
+        
+        try:
+            url = f"{self.base_url}/v1/booking/flight-orders/{booking_id}"
+            
+            status, data = await self._authorized_get(url, _AMADEUS_STATUS_TIMEOUT)
+            if status == 200:
+                order_status = data.get("data", {}).get("status")
+                return order_status.lower() if order_status else None
+            print(f"Amadeus booking status error: {status}")
+            return None
+        
+        except Exception as e:
+            print(f"Error getting booking status: {e}")
+            return None
+    
+    async def _authorized_get(self,
+                              url: str,
+                              timeout: aiohttp.ClientTimeout,
+                              params: Optional[Dict[str, Any]] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """GET with the bearer token, re-authenticating once if it was rejected"""
+        for attempt in range(2):
+            token = self.access_token
+            headers = {"Authorization": f"Bearer {token}"}
+            async with self.session.get(url, params=params, headers=headers, timeout=timeout) as response:
+                if response.status == 401 and attempt == 0:
+                    # Token revoked or expired early; fetch a new one and retry
+                    await self._authenticate(rejected_token=token)
+                    if self.access_token == token:
+                        return response.status, None
+                    continue
+                if response.status == 200:
+                    return response.status, await response.json()
+                return response.status, None
+    
     def _parse_flights(self, data: List[Dict]) -> List[Flight]:
         """Parse flights from API response"""
         flights = []
@@ -306,13 +405,18 @@ class StripeAPI:
         self.base_url = "https://api.stripe.com/v1"
         self.session = None
     
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+    async def connect(self):
+        """Bind to the shared session"""
+        if self.session is None or self.session.closed:
+            self.session = get_shared_session()
         return self
     
+    async def __aenter__(self):
+        return await self.connect()
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The session is shared; it is closed by close_shared_session()
+        pass
     
     async def create_payment_intent(self, 
                                   amount: float, 
@@ -320,8 +424,7 @@ class StripeAPI:
                                   description: str = "",
                                   metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Create a payment intent using Stripe API"""
-        if not self.session:
-            raise RuntimeError("API client not initialized. Use async context manager.")
+        await self.connect()
         
         try:
             url = f"{self.base_url}/payment_intents"
@@ -339,7 +442,7 @@ class StripeAPI:
                 "Content-Type": "application/x-www-form-urlencoded"
             }
             
-            async with self.session.post(url, data=data, headers=headers) as response:
+            async with self.session.post(url, data=data, headers=headers, timeout=_STRIPE_TIMEOUT) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -352,8 +455,7 @@ class StripeAPI:
     
     async def confirm_payment(self, payment_intent_id: str) -> Dict[str, Any]:
         """Confirm a payment intent"""
-        if not self.session:
-            raise RuntimeError("API client not initialized. Use async context manager.")
+        await self.connect()
         
         try:
             url = f"{self.base_url}/payment_intents/{payment_intent_id}/confirm"
@@ -362,7 +464,7 @@ class StripeAPI:
                 "Content-Type": "application/x-www-form-urlencoded"
             }
             
-            async with self.session.post(url, headers=headers) as response:
+            async with self.session.post(url, headers=headers, timeout=_STRIPE_TIMEOUT) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -381,18 +483,22 @@ class WeatherAPI:
         self.base_url = "https://api.openweathermap.org/data/2.5"
         self.session = None
     
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+    async def connect(self):
+        """Bind to the shared session"""
+        if self.session is None or self.session.closed:
+            self.session = get_shared_session()
         return self
     
+    async def __aenter__(self):
+        return await self.connect()
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The session is shared; it is closed by close_shared_session()
+        pass
     
     async def get_current_weather(self, city: str, country_code: str = "") -> Dict[str, Any]:
         """Get current weather for a city"""
-        if not self.session:
-            raise RuntimeError("API client not initialized. Use async context manager.")
+        await self.connect()
         
         try:
             location = f"{city},{country_code}" if country_code else city
@@ -403,7 +509,7 @@ class WeatherAPI:
                 "units": "metric"
             }
             
-            async with self.session.get(url, params=params) as response:
+            async with self.session.get(url, params=params, timeout=_WEATHER_TIMEOUT) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -416,8 +522,7 @@ class WeatherAPI:
     
     async def get_forecast(self, city: str, country_code: str = "", days: int = 5) -> Dict[str, Any]:
         """Get weather forecast for a city"""
-        if not self.session:
-            raise RuntimeError("API client not initialized. Use async context manager.")
+        await self.connect()
         
         try:
             location = f"{city},{country_code}" if country_code else city
@@ -429,7 +534,7 @@ class WeatherAPI:
                 "cnt": days * 8  # 8 forecasts per day (every 3 hours)
             }
             
-            async with self.session.get(url, params=params) as response:
+            async with self.session.get(url, params=params, timeout=_WEATHER_TIMEOUT) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
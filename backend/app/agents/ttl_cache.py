@@ -0,0 +1,74 @@
+"""
+In-process TTL cache for Travya agents
+
+Small dict-backed cache used to avoid re-hitting upstream APIs (or
+recomputing search results) for identical queries within a short window.
+Entries expire on a monotonic clock so wall-clock adjustments never
+extend or shorten their lifetime.
+"""
+
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+DEFAULT_MAXSIZE = 1024
+
+class TTLCache:
+    """Dict of key -> (expiry, value) with a per-cache default TTL"""
+
+    def __init__(self, ttl: float, maxsize: int = DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expiry, value = entry
+        if expiry <= time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store value under key for ttl seconds (defaults to the cache TTL)"""
+        if key not in self._data and len(self._data) >= self.maxsize:
+            self._evict()
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+
+    def _evict(self):
+        """Drop expired entries, then the oldest insertion if still full"""
+        now = time.monotonic()
+        expired = [key for key, (expiry, _) in self._data.items() if expiry <= now]
+        for key in expired:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+def _normalize(value: Any) -> Hashable:
+    """Normalize a parameter so equivalent queries share a key"""
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+def cache_key(namespace: str, **params) -> Tuple:
+    """Build a hashable cache key from a namespace and normalized params"""
+    return (namespace, *sorted((name, _normalize(value)) for name, value in params.items()))
@@ -736,9 +736,8 @@ async def stream_agent_events(session_id: str) -> StreamingResponse:
     
     async def event_generator():
         """Generate SSE events."""
-        # Create a queue for this session
-        queue = asyncio.Queue()
-        register_session(session_id, queue)
+        # Create an event buffer for this session
+        queue = register_session(session_id)
         
         try:
             # Send initial connection event
@@ -748,8 +747,9 @@ async def stream_agent_events(session_id: str) -> StreamingResponse:
             while True:
                 try:
                     # Wait for events with a timeout to send keep-alive
-                    event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(event)}\n\n"
+                    batch = await asyncio.wait_for(queue.get(), timeout=30.0)
+                    for event in batch:
+                        yield f"data: {json.dumps(event)}\n\n"
                 except asyncio.TimeoutError:
                     # Send keep-alive ping
                     yield f"data: {json.dumps({'event_type': 'ping', 'message': 'keep-alive'})}\n\n"
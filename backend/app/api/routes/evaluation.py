@@ -226,7 +226,8 @@ async def get_evaluation_history(
         if agent_name:
             evaluations = [e for e in evaluations if e.agent_name == agent_name]
         
-        # Limit results
+        # Limit results; the history is a deque, which cannot be sliced
+        evaluations = list(evaluations)
         evaluations = evaluations[-limit:] if limit > 0 else evaluations
         
         # Convert to response format
@@ -274,7 +275,8 @@ async def get_feedback_history(
         if agent_name:
             feedback_list = [f for f in feedback_list if f.agent_name == agent_name]
         
-        # Limit results
+        # Limit results; the history is a deque, which cannot be sliced
+        feedback_list = list(feedback_list)
         feedback_list = feedback_list[-limit:] if limit > 0 else feedback_list
         
         # Convert to response format
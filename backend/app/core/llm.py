@@ -1,6 +1,7 @@
 import os
 import asyncio
-from typing import Optional
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
 from app.core.config import settings
 
 # Try to import Google AI Studio client
@@ -10,8 +11,14 @@ try:
 except ImportError:
     GOOGLE_AI_AVAILABLE = False
 
+@lru_cache(maxsize=1)
 def _setup_google_ai():
-    """Setup Google AI Studio client"""
+    """Setup Google AI Studio client
+    
+    Configured once per process so every call reuses the SDK's client and
+    its open connection instead of re-creating them (and re-handshaking).
+    Failures are not cached, so a missing key is re-checked on the next call.
+    """
     if not GOOGLE_AI_AVAILABLE:
         raise ValueError("Google AI Studio client (google-generativeai) is not installed")
     if not settings.GOOGLE_AI_STUDIO_API_KEY:
@@ -19,20 +26,51 @@ def _setup_google_ai():
     genai.configure(api_key=settings.GOOGLE_AI_STUDIO_API_KEY)
     return genai.GenerativeModel(settings.GEMINI_MODEL)
 
-def call_llm(prompt: str) -> str:
-    """Call LLM with Google AI Studio API."""
+def _generation_config(response_schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Constrain output to JSON matching response_schema, when one is given"""
+    if response_schema is None:
+        return None
+    return {"response_mime_type": "application/json", "response_schema": response_schema}
+
+def call_llm(prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+    """Call LLM with Google AI Studio API.
+    
+    With a response_schema (a JSON schema dict) the model returns bare JSON
+    matching it instead of free text.
+    """
     try:
         model = _setup_google_ai()
-        response = model.generate_content(prompt)
+        response = model.generate_content(prompt, generation_config=_generation_config(response_schema))
         if response and response.text:
             return response.text
         raise ValueError("No valid response received from Google AI Studio API")
     except Exception as e:
         raise ValueError(f"Failed to call Google AI Studio API: {str(e)}")
 
-async def call_llm_async(prompt: str) -> str:
-    """Async version of LLM call"""
-    return call_llm(prompt)
+async def call_llm_async(prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+    """Async version of LLM call; the blocking SDK call runs off the event loop"""
+    return await asyncio.to_thread(call_llm, prompt, response_schema)
+
+async def call_llm_stream_async(prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """Stream an LLM response as text chunks while it is generated"""
+    try:
+        model = _setup_google_ai()
+        response = await asyncio.to_thread(
+            model.generate_content,
+            prompt,
+            generation_config=_generation_config(response_schema),
+            stream=True
+        )
+        chunks = iter(response)
+        while True:
+            # The SDK's stream is a blocking iterator; pull each chunk off the event loop
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        raise ValueError(f"Failed to stream from Google AI Studio API: {str(e)}") from e
 
 def test_google_ai_connection() -> bool:
     """Test Google AI Studio API connection"""
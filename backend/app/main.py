@@ -1,8 +1,18 @@
+import logging
+import queue
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
+from app.agents.base_agent import dumps_json
+from app.agents.real_apis import close_shared_session
 from app.api.main import api_router
 from app.core.config import settings
 
@@ -11,13 +21,41 @@ def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+class AgentJSONResponse(JSONResponse):
+    """JSON response encoded with the agents' encoder (orjson when installed)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Route root-logger records through a queue so logging from the event loop
+    # never blocks on a stream write; a listener thread does the writing
+    root_logger = logging.getLogger()
+    original_handlers = root_logger.handlers
+    handlers = original_handlers or [logging.StreamHandler()]
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    try:
+        yield
+    finally:
+        await close_shared_session()
+        listener.stop()
+        root_logger.handlers = original_handlers
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    default_response_class=AgentJSONResponse,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
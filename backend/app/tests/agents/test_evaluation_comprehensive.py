@@ -19,6 +19,18 @@ from app.agents.evaluation import (
     get_agent_performance
 )
 
+def judge_replies(**replies):
+    """Build a call_llm side effect that answers each judge prompt by criterion.
+    
+    Judge calls run concurrently, so replies are matched on prompt text rather than call order.
+    """
+    def respond(prompt):
+        for criterion, reply in replies.items():
+            if f"the {criterion} of this" in prompt:
+                return reply
+        return replies["overall"]
+    return respond
+
 class TestAgentEvaluator:
     """Test the AgentEvaluator class"""
     
@@ -31,13 +43,13 @@ class TestAgentEvaluator:
         """Test LLM-as-a-judge evaluation"""
         with patch('app.agents.evaluation.call_llm') as mock_llm:
             # Mock LLM responses
-            mock_llm.side_effect = [
-                "8",  # accuracy
-                "7",  # relevance
-                "9",  # helpfulness
-                "6",  # creativity
-                "8.5 - This is a good response that addresses the query well"  # overall
-            ]
+            mock_llm.side_effect = judge_replies(
+                accuracy="8",
+                relevance="7",
+                helpfulness="9",
+                creativity="6",
+                overall="8.5 - This is a good response that addresses the query well"
+            )
             
             result = await self.evaluator.evaluate_with_llm_judge(
                 agent_name="test_agent",
@@ -235,7 +247,9 @@ class TestEvaluationIntegration:
         
         # Step 1: LLM evaluation
         with patch('app.agents.evaluation.call_llm') as mock_llm:
-            mock_llm.side_effect = ["8", "7", "9", "6", "8 - Good response"]
+            mock_llm.side_effect = judge_replies(
+                accuracy="8", relevance="7", helpfulness="9", creativity="6", overall="8 - Good response"
+            )
             
             llm_result = await evaluator.evaluate_with_llm_judge(
                 agent_name="test_agent",
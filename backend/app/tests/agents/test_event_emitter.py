@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.agents.event_emitter import (
+    COALESCE_WINDOW,
+    SpscRing,
+    agent_event_queues,
+    emit_agent_event,
+    register_session,
+    unregister_session,
+)
+
+
+def test_ring_returns_items_in_order():
+    """Items come back first-in, first-out and free their slot."""
+    ring = SpscRing(4)
+    for item in ("a", "b", "c"):
+        assert ring.put(item)
+
+    assert len(ring) == 3
+    assert [asyncio.run(ring.get()) for _ in range(3)] == ["a", "b", "c"]
+    assert ring.buf == [None] * 4
+    assert ring.dropped == 0
+
+
+def test_ring_overflow_drops_oldest_and_counts_it():
+    """A full ring overwrites its oldest item instead of blocking the producer."""
+    ring = SpscRing(2)
+    assert ring.put(1)
+    assert ring.put(2)
+    assert not ring.put(3)
+    assert not ring.put(4)
+
+    assert ring.dropped == 2
+    assert len(ring) == 2
+    assert [asyncio.run(ring.get()) for _ in range(2)] == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_ring_get_waits_for_put():
+    ring = SpscRing(2)
+    waiter = asyncio.create_task(ring.get())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    ring.put("event")
+    assert await asyncio.wait_for(waiter, timeout=1) == "event"
+
+
+@pytest.mark.asyncio
+async def test_events_in_one_window_are_flushed_as_one_batch():
+    """Events emitted together arrive as a single batch, in emission order."""
+    ring = register_session("emitter_batch_test")
+    try:
+        for i in range(3):
+            await emit_agent_event("emitter_batch_test", {"event_type": "thinking", "step": i})
+        assert len(ring) == 0  # nothing is delivered until the window closes
+
+        first = await asyncio.wait_for(ring.get(), timeout=1)
+        await emit_agent_event("emitter_batch_test", {"event_type": "complete"})
+        second = await asyncio.wait_for(ring.get(), timeout=1)
+    finally:
+        unregister_session("emitter_batch_test")
+
+    assert [event["step"] for event in first] == [0, 1, 2]
+    assert second == [{"event_type": "complete"}]
+
+
+@pytest.mark.asyncio
+async def test_flush_into_full_buffer_drops_oldest_batch():
+    """A consumer that falls behind loses whole batches, oldest first."""
+    ring = register_session("emitter_overflow_test", capacity=1)
+    try:
+        for step in range(2):
+            await emit_agent_event("emitter_overflow_test", {"event_type": "thinking", "step": step})
+            await asyncio.sleep(COALESCE_WINDOW * 4)
+        batch = await asyncio.wait_for(ring.get(), timeout=1)
+    finally:
+        unregister_session("emitter_overflow_test")
+
+    assert ring.dropped == 1
+    assert batch == [{"event_type": "thinking", "step": 1}]
+
+
+@pytest.mark.asyncio
+async def test_unregister_cancels_pending_flush():
+    ring = register_session("emitter_cancel_test")
+    await emit_agent_event("emitter_cancel_test", {"event_type": "start"})
+    unregister_session("emitter_cancel_test")
+    await asyncio.sleep(COALESCE_WINDOW * 4)
+
+    assert "emitter_cancel_test" not in agent_event_queues
+    assert len(ring) == 0
+
+
+@pytest.mark.asyncio
+async def test_emit_without_session_is_ignored():
+    await emit_agent_event("emitter_unknown_session", {"event_type": "start"})
+    assert "emitter_unknown_session" not in agent_event_queues
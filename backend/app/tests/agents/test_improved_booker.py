@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.improved_booker_agent import ImprovedBookerAgent
+
+TRIP_REQUEST = {
+    "origin": "JFK",
+    "destination": "LIS",
+    "departure_date": "2024-06-01",
+    "check_in": "2024-06-01",
+    "check_out": "2024-06-04",
+    "passengers": 2,
+    "amount": 1200,
+}
+
+
+@pytest.fixture(autouse=True)
+def mock_suppliers():
+    """Run the booker against its mock flight and payment paths."""
+    with patch("app.agents.improved_booker_agent._AMADEUS_ENABLED", False), \
+            patch("app.agents.improved_booker_agent._STRIPE_ENABLED", False):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_trip_booking_books_every_section():
+    """A trip request returns flight, hotel and payment sections."""
+    response = await ImprovedBookerAgent().process_request({"type": "trip", "booking_request": TRIP_REQUEST})
+
+    assert response.success
+    data = response.data
+    assert data["query_type"] == "trip"
+    assert data["flight_booking"]["passengers"] == 2
+    assert data["hotel_booking"]["total_price"] == 450  # three nights
+    assert data["payment"]["amount"] == 1200
+    assert "hotel_booking" in response.metadata["capabilities_used"]
+
+
+@pytest.mark.asyncio
+async def test_trip_booking_keeps_sections_that_succeed():
+    """One failing section is reported in place without failing the trip."""
+    async def failing_hotel(self, booking_request, itinerary, now):
+        raise RuntimeError("no rooms")
+
+    with patch.object(ImprovedBookerAgent, "_process_hotel_booking", failing_hotel):
+        response = await ImprovedBookerAgent().process_request({"type": "trip", "booking_request": TRIP_REQUEST})
+
+    assert response.success
+    assert response.data["hotel_booking"] == {"status": "error", "message": "hotel_booking failed: no rooms"}
+    assert response.data["flight_booking"]["booking_status"] == "confirmed"
+    assert response.data["payment"]["status"] == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_trip_booking_rejects_invalid_request():
+    """Schema violations are rejected before any section is booked."""
+    agent = ImprovedBookerAgent()
+    with patch.object(ImprovedBookerAgent, "_process_trip_booking") as mock_trip:
+        response = await agent.process_request({"type": "trip", "booking_request": TRIP_REQUEST | {"passengers": 0}})
+
+    assert not response.success
+    assert response.error.startswith("Invalid booking request")
+    mock_trip.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unknown_booking_type_is_rejected():
+    """Only the booking types the agent has handlers for are accepted."""
+    agent = ImprovedBookerAgent()
+    assert await agent.validate_request({"type": "trip"})
+    assert not await agent.validate_request({"type": "cruise"})
+
+    response = await agent.process_direct({"type": "cruise", "booking_request": TRIP_REQUEST})
+    assert not response.success
+
+
+@pytest.mark.asyncio
+async def test_confirming_mock_booking_skips_amadeus():
+    """A booking id issued by the mock fallback is never polled."""
+    with patch("app.agents.improved_booker_agent._AMADEUS_ENABLED", True), \
+            patch.object(ImprovedBookerAgent, "_poll_booking_status") as mock_poll:
+        response = await ImprovedBookerAgent().process_request({
+            "type": "confirm",
+            "booking_request": {"booking_id": "mock_flight_7", "booking_type": "flight"},
+        })
+
+    assert response.data["confirmation"]["status"] == "confirmed"
+    mock_poll.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_confirming_without_amadeus_skips_polling():
+    """Without Amadeus credentials confirmation never reaches the supplier."""
+    with patch.object(ImprovedBookerAgent, "_poll_booking_status") as mock_poll:
+        response = await ImprovedBookerAgent().process_request({
+            "type": "confirm",
+            "booking_request": {"booking_id": "ORDER123", "booking_type": "flight"},
+        })
+
+    assert response.data["confirmation"]["status"] == "confirmed"
+    mock_poll.assert_not_called()
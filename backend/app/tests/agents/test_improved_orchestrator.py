@@ -0,0 +1,245 @@
+import asyncio
+import copy
+
+import pytest
+
+from app.agents.base_agent import AgentResponse, BaseAgent
+from app.agents.event_emitter import register_session, unregister_session
+from app.agents.improved_orchestrator import (
+    WORKFLOWS,
+    ImprovedOrchestrator,
+    _freeze_workflow,
+    _workflow_levels,
+)
+
+
+class FakeAgent(BaseAgent):
+    """Workflow agent that records its requests and answers after a delay"""
+
+    def __init__(self, name, data=None, delay=0.0, error=None):
+        super().__init__(name=name, description=f"Fake {name}", capabilities=[])
+        self.data = data if data is not None else {"agent": name, "confidence": 0.9}
+        self.delay = delay
+        self.error = error
+        self.requests = []
+
+    async def validate_request(self, request):
+        return True
+
+    async def process_request(self, request):
+        self.requests.append(dict(request))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            return AgentResponse(False, error=self.error)
+        return AgentResponse(True, copy.deepcopy(self.data))
+
+
+def make_orchestrator(*agents):
+    orchestrator = ImprovedOrchestrator()
+    orchestrator._registered = True
+    orchestrator._agent_handles = {agent.name: agent for agent in agents}
+    # The telemetry exporter task would outlive each test's event loop
+    orchestrator._emit_telemetry = lambda *args: None
+    return orchestrator
+
+
+async def drain_events(ring, count, timeout=1.0):
+    events = []
+    while len(events) < count:
+        events.extend(await asyncio.wait_for(ring.get(), timeout=timeout))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_stream_request_yields_steps_as_they_finish():
+    """Agents in one level are streamed in completion order, then the synthesized result."""
+    orchestrator = make_orchestrator(
+        FakeAgent("research", delay=0.05),
+        FakeAgent("booker", delay=0.0),
+    )
+
+    updates = [update async for update in orchestrator.stream_request({"type": "orchestrate", "query": "book a hotel"})]
+
+    assert [(update["agent"], update["partial"]) for update in updates] == [
+        ("booker", True),
+        ("research", True),
+        ("orchestrator", False),
+    ]
+    assert updates[0]["data"] == {"agent": "booker", "confidence": 0.9}
+    assert updates[-1]["data"]["detailed_results"]["research"] == {"agent": "research", "confidence": 0.9}
+
+
+@pytest.mark.asyncio
+async def test_stream_request_reports_failure_last():
+    """An orchestration error ends the stream with a non-partial error item."""
+    orchestrator = make_orchestrator(FakeAgent("research"))
+    orchestrator._determine_workflow = lambda request_type, request: 1 / 0
+
+    updates = [update async for update in orchestrator.stream_request({"type": "research_only"})]
+
+    assert len(updates) == 1
+    assert updates[0]["partial"] is False
+    assert "division by zero" in updates[0]["error"]
+
+
+@pytest.mark.asyncio
+async def test_trip_planning_emits_each_step_before_returning():
+    """Each finished step is announced on the session's agent stream."""
+    orchestrator = make_orchestrator(
+        FakeAgent("research"),
+        FakeAgent("planner"),
+        FakeAgent("booker", error="no availability"),
+    )
+    ring = register_session("orchestrator_stream_test")
+    try:
+        result = await orchestrator.execute_trip_planning_workflow(
+            {"destination": "Lisbon"}, user_id="user", session_id="orchestrator_stream_test"
+        )
+        events = await drain_events(ring, 3)
+    finally:
+        unregister_session("orchestrator_stream_test")
+
+    assert [(event["agent_type"], event["event_type"]) for event in events] == [
+        ("research", "complete"),
+        ("planner", "complete"),
+        ("booker", "error"),
+    ]
+    assert events[0]["confidence"] == 0.9
+    assert events[2]["data"] == {"error": "no availability"}
+    assert result["detailed_results"]["planning"] == {"agent": "planner", "confidence": 0.9}
+
+
+def test_workflow_levels_follow_dependencies():
+    """Each agent runs one level after the last agent it depends on."""
+    assert _workflow_levels(WORKFLOWS["trip_planning"]) == [["research"], ["planner"], ["booker"]]
+    assert _workflow_levels(_freeze_workflow({"a": (), "b": (), "c": ("a",), "d": ("b", "c")})) == [
+        ["a", "b"],
+        ["c"],
+        ["d"],
+    ]
+
+
+def test_workflow_levels_ignore_prerequisites_outside_workflow():
+    """A dependency on an agent the workflow doesn't run never blocks."""
+    assert _workflow_levels(_freeze_workflow({"research": (), "booker": ("planner",)})) == [["research", "booker"]]
+
+
+def test_workflow_levels_reject_cycles():
+    with pytest.raises(ValueError, match="cycle"):
+        _workflow_levels(_freeze_workflow({"a": ("b",), "b": ("a",)}))
+
+
+@pytest.mark.asyncio
+async def test_downstream_steps_receive_upstream_results():
+    """The planner gets the research result and the booker gets the plan."""
+    research = FakeAgent("research", data={"attractions": ["Belem Tower"], "confidence": 0.7})
+    planner = FakeAgent("planner", data={"itinerary": {"days": []}, "confidence": 0.8})
+    booker = FakeAgent("booker")
+    orchestrator = make_orchestrator(research, planner, booker)
+
+    response = await orchestrator.process_request({"type": "trip_planning", "trip_request": {"destination": "Lisbon"}})
+
+    assert response.success
+    assert planner.requests[0]["type"] == "plan"
+    assert planner.requests[0]["research_data"] == {"attractions": ["Belem Tower"], "confidence": 0.7}
+    assert booker.requests[0]["itinerary"] == {"itinerary": {"days": []}, "confidence": 0.8}
+    # Every step also sees the shared request
+    assert booker.requests[0]["trip_request"] == {"destination": "Lisbon"}
+    assert response.metadata["agents_involved"] == ["research", "planner", "booker"]
+
+
+@pytest.mark.asyncio
+async def test_failed_step_does_not_stop_its_level():
+    """One agent failing leaves the other agents in its level intact."""
+    orchestrator = make_orchestrator(
+        FakeAgent("research", delay=0.01),
+        FakeAgent("booker", error="payment declined"),
+    )
+
+    response = await orchestrator.process_request({"type": "orchestrate", "query": "book a flight"})
+
+    results = response.data["detailed_results"]
+    assert results["research"] == {"agent": "research", "confidence": 0.9}
+    assert results["booking"] == {"error": "payment declined"}
+    assert "booker" in response.data["next_steps"][0]
+
+
+@pytest.mark.asyncio
+async def test_failed_step_is_not_passed_downstream():
+    """Later levels still run, without the failed agent's result."""
+    planner = FakeAgent("planner")
+    orchestrator = make_orchestrator(FakeAgent("research", error="rag offline"), planner)
+
+    response = await orchestrator.process_request({"type": "itinerary_creation"})
+
+    assert response.data["detailed_results"]["research"] == {"error": "rag offline"}
+    assert len(planner.requests) == 1
+    assert "research_data" not in planner.requests[0]
+
+
+def search_request(user_id, query="Lisbon museums", **context):
+    return {
+        "type": "research_only",
+        "query": query,
+        "context": {"user_id": user_id, "session_id": f"session_{user_id}", "timestamp": "now", **context},
+    }
+
+
+@pytest.mark.asyncio
+async def test_result_cache_miss_then_hit():
+    """A repeated step is served from the cache instead of calling the agent again."""
+    research = FakeAgent("research")
+    orchestrator = make_orchestrator(research)
+
+    first = await orchestrator.process_request(search_request("alice"))
+    second = await orchestrator.process_request(search_request("alice"))
+
+    assert first.metadata["cache_status"] == {"research": "miss"}
+    assert second.metadata["cache_status"] == {"research": "hit"}
+    assert len(research.requests) == 1
+    assert second.data["detailed_results"]["research"] == first.data["detailed_results"]["research"]
+
+
+@pytest.mark.asyncio
+async def test_result_cache_bypassed_for_bookings():
+    """Bookings are not idempotent, so the booker is called every time."""
+    booker = FakeAgent("booker")
+    orchestrator = make_orchestrator(booker)
+
+    for _ in range(2):
+        response = await orchestrator.process_request({"type": "booking_only"})
+        assert response.metadata["cache_status"] == {"booker": "bypass"}
+
+    assert len(booker.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_result_cache_hits_are_independent_copies():
+    """Mutating a served result doesn't change what later requests receive."""
+    orchestrator = make_orchestrator(FakeAgent("research", data={"attractions": ["Belem Tower"]}))
+
+    first = await orchestrator.process_request(search_request("alice"))
+    first.data["detailed_results"]["research"]["attractions"].append("injected")
+    second = await orchestrator.process_request(search_request("bob"))
+    second.data["detailed_results"]["research"]["attractions"].clear()
+    third = await orchestrator.process_request(search_request("carol"))
+
+    assert third.metadata["cache_status"] == {"research": "hit"}
+    assert third.data["detailed_results"]["research"] == {"attractions": ["Belem Tower"]}
+
+
+@pytest.mark.asyncio
+async def test_result_cache_key_only_shares_identical_requests():
+    """Caller identity is ignored, but any other request difference gets its own entry."""
+    research = FakeAgent("research")
+    orchestrator = make_orchestrator(research)
+
+    await orchestrator.process_request(search_request("alice"))
+    shared = await orchestrator.process_request(search_request("bob", query="  LISBON museums "))
+    other_query = await orchestrator.process_request(search_request("bob", query="Porto museums"))
+    other_context = await orchestrator.process_request(search_request("bob", preferences={"budget": "low"}))
+
+    assert shared.metadata["cache_status"] == {"research": "hit"}
+    assert other_query.metadata["cache_status"] == {"research": "miss"}
+    assert other_context.metadata["cache_status"] == {"research": "miss"}
+    assert len(research.requests) == 3
@@ -0,0 +1,109 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.event_emitter import register_session, unregister_session
+from app.agents.improved_planner_agent import ImprovedPlannerAgent, NormalizedTripRequest, _DayStreamParser
+
+ITINERARY = {
+    "itinerary": {
+        "overview": {"destination": "Lisbon", "duration": 2},
+        "days": [
+            {"day": 1, "activities": [{"name": "Tram 28", "tags": ["view", ["nested"]]}], "meals": []},
+            {"day": 2, "activities": [{"name": "Say \"olá\" {here}"}], "meals": [{"type": "dinner"}]},
+        ],
+        "tips": [["pack", "layers"]],
+    }
+}
+
+
+def feed_all(parser, chunks):
+    days = []
+    for chunk in chunks:
+        days.extend(parser.feed(chunk))
+    return days
+
+
+def test_day_parser_handles_single_character_chunks():
+    """Days are recovered however the stream is split."""
+    text = json.dumps(ITINERARY)
+    assert feed_all(_DayStreamParser(), text) == ITINERARY["itinerary"]["days"]
+
+
+def test_day_parser_emits_each_day_once_it_closes():
+    """A day is returned by the chunk that completes it, not before."""
+    text = json.dumps(ITINERARY)
+    second_day = text.index('{"day": 2')
+    parser = _DayStreamParser()
+    assert parser.feed(text[:second_day + 5]) == [ITINERARY["itinerary"]["days"][0]]
+    assert parser.feed(text[second_day + 5:]) == [ITINERARY["itinerary"]["days"][1]]
+
+
+def test_day_parser_ignores_brackets_inside_strings():
+    """Escaped quotes and braces in string values don't end a day early."""
+    text = '{"days": [{"day": 1, "note": "a \\"quoted\\" } ] value"}]}'
+    assert feed_all(_DayStreamParser(), [text[:20], text[20:]]) == [
+        {"day": 1, "note": 'a "quoted" } ] value'}
+    ]
+
+
+def test_day_parser_ignores_arrays_after_days():
+    """Objects in arrays after the days array are not mistaken for days."""
+    text = '{"days": [{"day": 1, "slots": [[1, 2], {"x": [3]}]}], "extra": [{"day": 99}]}'
+    assert feed_all(_DayStreamParser(), [text]) == [{"day": 1, "slots": [[1, 2], {"x": [3]}]}]
+
+
+@pytest.mark.asyncio
+async def test_generate_itinerary_streams_days_to_session():
+    """Each completed day is emitted to the session before the itinerary returns."""
+    text = json.dumps(ITINERARY)
+
+    async def fake_stream(prompt, schema=None):
+        for i in range(0, len(text), 16):
+            yield text[i:i + 16]
+
+    ring = register_session("planner_stream_test")
+    try:
+        with patch("app.agents.improved_planner_agent.call_llm_stream_async", fake_stream):
+            itinerary = await ImprovedPlannerAgent()._generate_itinerary(
+                NormalizedTripRequest(destination="Lisbon", duration=2), {}, "2024-01-01T00:00:00+00:00", "planner_stream_test"
+            )
+        batch = await asyncio.wait_for(ring.get(), timeout=1)
+    finally:
+        unregister_session("planner_stream_test")
+
+    assert [event["data"]["day"] for event in batch] == ITINERARY["itinerary"]["days"]
+    assert {event["event_type"] for event in batch} == {"result"}
+    assert itinerary["itinerary"]["days"] == ITINERARY["itinerary"]["days"]
+
+
+def test_enhancements_are_independent_copies():
+    """Editing one itinerary's tips doesn't leak into the next."""
+    agent = ImprovedPlannerAgent()
+    first = agent._build_enhancements(NormalizedTripRequest(destination="Lisbon"))
+    first["safety_tips"].clear()
+    first["emergency_contacts"]["emergency"] = "112"
+
+    second = agent._build_enhancements(NormalizedTripRequest(destination="Tokyo"))
+    assert second["safety_tips"]
+    assert second["emergency_contacts"]["emergency"] == "911"
+
+
+@pytest.mark.asyncio
+async def test_full_plan_includes_budget_and_optimization():
+    """A full plan returns the itinerary with its budget and optimization plans."""
+    async def fake_stream(prompt, schema=None):
+        yield json.dumps(ITINERARY)
+
+    with patch("app.agents.improved_planner_agent.call_llm_stream_async", fake_stream):
+        response = await ImprovedPlannerAgent().process_request({
+            "type": "full",
+            "trip_request": {"destination": "Lisbon", "duration": 2, "budget": 1000},
+        })
+
+    assert response.success
+    assert response.data["itinerary"]["itinerary"]["days"] == ITINERARY["itinerary"]["days"]
+    assert response.data["budget_plan"]["daily_budget"] == 500
+    assert response.data["optimized_plan"]["optimization_type"] == "route_and_time"
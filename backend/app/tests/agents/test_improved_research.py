@@ -0,0 +1,91 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.event_emitter import register_session, unregister_session
+from app.agents.improved_research_agent import ImprovedResearchAgent
+
+WEATHER = {"current": {"description": "sunny"}, "forecast": [], "last_updated": "2024-01-01T00:00:00+00:00"}
+
+
+async def fake_weather(self, destination, request, now_iso):
+    return WEATHER
+
+
+@pytest.mark.asyncio
+async def test_research_announces_each_section_on_session_stream():
+    """A finished lookup is emitted to the request's session with its data."""
+    ring = register_session("research_stream_test")
+    try:
+        with patch.object(ImprovedResearchAgent, "_get_weather", fake_weather):
+            response = await ImprovedResearchAgent().process_request({
+                "type": "weather",
+                "destination": "Lisbon",
+                "context": {"session_id": "research_stream_test"},
+            })
+        batch = await asyncio.wait_for(ring.get(), timeout=1)
+    finally:
+        unregister_session("research_stream_test")
+
+    assert response.success
+    assert response.data["weather"] == WEATHER
+    assert [(event["event_type"], event["data"]) for event in batch] == [("result", {"weather": WEATHER})]
+
+
+@pytest.mark.asyncio
+async def test_research_without_session_emits_nothing():
+    """Requests without a session id are answered without touching the event stream."""
+    with patch.object(ImprovedResearchAgent, "_get_weather", fake_weather), \
+            patch("app.agents.improved_research_agent.emit_agent_event") as mock_emit:
+        response = await ImprovedResearchAgent().process_request({"type": "weather", "destination": "Lisbon"})
+
+    assert response.data["weather"] == WEATHER
+    mock_emit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_research_cancels_its_lookups():
+    """Cancelling a request stops the lookups it started."""
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow_weather(self, destination, request, now_iso):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with patch.object(ImprovedResearchAgent, "_get_weather", slow_weather):
+        request = asyncio.create_task(
+            ImprovedResearchAgent().process_request({"type": "weather", "destination": "Lisbon"})
+        )
+        await asyncio.wait_for(started.wait(), timeout=1)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_broad_research_only_queries_knowledge_base():
+    """Research requests don't spend external API calls on attractions or weather."""
+    async def fake_rag(self, query, context):
+        return {"knowledge_response": "Lisbon guide", "sources": [], "rag_confidence": 0.8, "real_time_data": False}
+
+    with patch.object(ImprovedResearchAgent, "_query_rag_system", fake_rag), \
+            patch.object(ImprovedResearchAgent, "_get_attractions") as mock_attractions, \
+            patch.object(ImprovedResearchAgent, "_get_weather") as mock_weather:
+        response = await ImprovedResearchAgent().process_request({
+            "type": "research",
+            "query": "What should I see in Lisbon over a long weekend?",
+            "destination": "Lisbon",
+        })
+
+    assert response.data["knowledge_response"] == "Lisbon guide"
+    mock_attractions.assert_not_called()
+    mock_weather.assert_not_called()
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+
+from app.agents.real_apis import AmadeusAPI
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None):
+        self.status = status
+        self.payload = payload or {}
+
+    async def json(self):
+        return self.payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class DelayedResponse(FakeResponse):
+    def __init__(self, response):
+        super().__init__(response.status, response.payload)
+
+    async def __aenter__(self):
+        await asyncio.sleep(0.01)
+        return self
+
+
+class FakeSession:
+    """Token endpoint that answers from a script after a short delay"""
+
+    closed = False
+
+    def __init__(self, *token_responses, get_responses=()):
+        self.token_responses = list(token_responses)
+        self.get_responses = list(get_responses)
+        self.token_requests = 0
+        self.authorizations = []
+
+    def post(self, url, data=None, timeout=None):
+        self.token_requests += 1
+        return DelayedResponse(self.token_responses.pop(0))
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.authorizations.append(headers["Authorization"])
+        return self.get_responses.pop(0)
+
+
+def token(value, expires_in=1800):
+    return FakeResponse(200, {"access_token": value, "expires_in": expires_in})
+
+
+def make_api(session):
+    api = AmadeusAPI("client", "secret")
+    api.session = session
+    return api
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_token_request():
+    """Callers arriving during a refresh wait for it instead of starting their own."""
+    session = FakeSession(token("fresh"))
+    api = make_api(session)
+
+    await asyncio.gather(*(api.connect() for _ in range(5)))
+
+    assert session.token_requests == 1
+    assert api.access_token == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_kept_until_refresh_succeeds():
+    """A failed refresh leaves the previous token in place rather than clearing it."""
+    session = FakeSession(FakeResponse(500))
+    api = make_api(session)
+    api.access_token = "old"
+    api.token_expires_at = time.monotonic() - 1
+
+    waiter = asyncio.create_task(api.connect())
+    await asyncio.sleep(0)
+    assert api.access_token == "old"  # still usable while the refresh is in flight
+    await waiter
+
+    assert session.token_requests == 1
+    assert api.access_token == "old"
+
+
+@pytest.mark.asyncio
+async def test_rejected_token_is_refreshed_once_and_retried():
+    """A 401 refreshes the token and repeats the request with the new one."""
+    session = FakeSession(
+        token("fresh"),
+        get_responses=[FakeResponse(401), FakeResponse(200, {"data": []})],
+    )
+    api = make_api(session)
+    api.access_token = "revoked"
+    api.token_expires_at = time.monotonic() + 600
+
+    status, data = await api._authorized_get("https://example.test/orders", timeout=None)
+
+    assert (status, data) == (200, {"data": []})
+    assert session.authorizations == ["Bearer revoked", "Bearer fresh"]
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_after_rejection_stops_retrying():
+    """The request is not retried with the token that was just rejected."""
+    session = FakeSession(FakeResponse(500), get_responses=[FakeResponse(401)])
+    api = make_api(session)
+    api.access_token = "revoked"
+    api.token_expires_at = time.monotonic() + 600
+
+    status, data = await api._authorized_get("https://example.test/orders", timeout=None)
+
+    assert (status, data) == (401, None)
+    assert session.authorizations == ["Bearer revoked"]
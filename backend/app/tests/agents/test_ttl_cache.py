@@ -0,0 +1,30 @@
+from unittest.mock import patch
+
+from app.agents.ttl_cache import TTLCache, cache_key
+
+
+def test_cache_key_normalizes_strings_and_floats():
+    """Equivalent queries should map to the same key."""
+    assert cache_key("flights", origin=" JFK ", price=10.001) == cache_key("flights", price=10.0, origin="jfk")
+    assert cache_key("flights", origin="JFK") != cache_key("hotels", origin="JFK")
+
+
+def test_ttl_cache_expires_entries():
+    """Entries are served until their TTL elapses."""
+    cache = TTLCache(ttl=10)
+    with patch("app.agents.ttl_cache.time.monotonic", return_value=100.0):
+        cache.set("k", "v")
+        assert cache.get("k") == "v"
+    with patch("app.agents.ttl_cache.time.monotonic", return_value=110.0):
+        assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_oldest_when_full():
+    """A full cache drops its oldest entry to make room."""
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2 and cache.get("c") == 3
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from app.agents.event_emitter import agent_event_queues, emit_agent_event
+from app.api.routes.ai_travel import stream_agent_events
+
+
+def sse_payload(chunk: str) -> dict:
+    assert chunk.startswith("data: ") and chunk.endswith("\n\n")
+    return json.loads(chunk[len("data: "):])
+
+
+@pytest.mark.asyncio
+async def test_agent_stream_sends_each_event_of_a_batch() -> None:
+    response = await stream_agent_events("sse_batch_test")
+    assert response.media_type == "text/event-stream"
+    body = response.body_iterator
+    try:
+        # The session is registered before the connected event is sent
+        assert sse_payload(await anext(body))["event_type"] == "connected"
+        await emit_agent_event("sse_batch_test", {"event_type": "start", "agent_type": "research"})
+        await emit_agent_event("sse_batch_test", {"event_type": "complete", "agent_type": "research"})
+        events = [sse_payload(await anext(body)) for _ in range(2)]
+    finally:
+        await body.aclose()
+
+    assert [event["event_type"] for event in events] == ["start", "complete"]
+    assert "sse_batch_test" not in agent_event_queues
@@ -0,0 +1,75 @@
+from collections.abc import Generator
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.evaluation import (
+    EvaluationCriteria,
+    EvaluationResult,
+    EvaluationType,
+    HumanFeedback,
+    evaluator,
+)
+from app.core.config import settings
+
+
+@pytest.fixture
+def seeded_history() -> Generator[None, None, None]:
+    evaluator.evaluation_history.clear()
+    evaluator.human_feedback.clear()
+    for i in range(3):
+        evaluator.evaluation_history.append(
+            EvaluationResult(
+                evaluation_id=f"eval_{i}",
+                agent_name="test_agent",
+                evaluation_type=EvaluationType.LLM_AS_JUDGE,
+                criteria=EvaluationCriteria(accuracy=8.0),
+                overall_score=7.0 + i,
+                feedback=f"feedback {i}",
+                timestamp=datetime.now(),
+                metadata={},
+            )
+        )
+        evaluator.human_feedback.append(
+            HumanFeedback(
+                user_id="test_user",
+                agent_name="test_agent",
+                query="query",
+                response="response",
+                rating=i + 1,
+                feedback_text=f"feedback {i}",
+                timestamp=datetime.now(),
+            )
+        )
+    yield
+    evaluator.evaluation_history.clear()
+    evaluator.human_feedback.clear()
+
+
+@pytest.mark.usefixtures("seeded_history")
+def test_get_evaluation_history_without_filter(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/evaluation/evaluations",
+        headers=superuser_token_headers,
+        params={"limit": 2},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [e["evaluation_id"] for e in content] == ["eval_1", "eval_2"]
+
+
+@pytest.mark.usefixtures("seeded_history")
+def test_get_feedback_history_without_filter(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/evaluation/feedback",
+        headers=superuser_token_headers,
+        params={"limit": 2},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [f["rating"] for f in content] == [2, 3]
@@ -0,0 +1,21 @@
+import json
+from datetime import datetime
+
+from app.agents.base_agent import AgentResponse
+from app.main import AgentJSONResponse, app
+
+
+def test_app_encodes_responses_with_agent_encoder() -> None:
+    assert app.router.default_response_class is AgentJSONResponse
+
+
+def test_agent_json_response_renders_agent_payload() -> None:
+    payload = AgentResponse(True, {"flights": [{"price": 120.5}]}).to_dict()
+    response = AgentJSONResponse(payload)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == payload
+
+
+def test_agent_json_response_marks_naive_datetimes_utc() -> None:
+    response = AgentJSONResponse({"departure": datetime(2024, 1, 1, 9, 30)})
+    assert json.loads(response.body) == {"departure": "2024-01-01T09:30:00+00:00"}